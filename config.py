@@ -542,9 +542,8 @@ CRYPTOPANIC_API_KEY = config.get_api_key('CRYPTOPANIC_API_KEY')
 # Export config instance as Config for backward compatibility
 Config = config
 
-def create_env_template():
-    """יצירת template לקובץ .env"""
-    template = """# Kraken API Configuration (Required for live trading)
+# תבנית .env.example - מקודדת ל-bytes פעם אחת ונכתבת ישירות עם os.write
+_ENV_TEMPLATE = """# Kraken API Configuration (Required for live trading)
 KRAKEN_API_KEY=your_kraken_api_key_here
 KRAKEN_API_SECRET=your_kraken_api_secret_here
 
@@ -610,13 +609,22 @@ TRADING_24_7=true
 DATA_BACKUP_ENABLED=true
 BACKUP_INTERVAL_HOURS=24
 """
-    
+_ENV_TEMPLATE_BYTES = _ENV_TEMPLATE.encode('utf-8')
+
+def create_env_template():
+    """יצירת template לקובץ .env"""
     env_file = Path('.env.example')
-    if not env_file.exists():
-        with open(env_file, 'w') as f:
-            f.write(template)
-        print(f"✅ Created {env_file}")
-        print("📝 Copy this file to .env and configure your settings")
+    try:
+        # O_EXCL - לא דורס קובץ קיים, בלי בדיקת exists נפרדת
+        fd = os.open(env_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+    except FileExistsError:
+        return
+    try:
+        os.write(fd, _ENV_TEMPLATE_BYTES)
+    finally:
+        os.close(fd)
+    print(f"✅ Created {env_file}")
+    print("📝 Copy this file to .env and configure your settings")
 
 if __name__ == '__main__':
     create_env_template()
@@ -3,7 +3,7 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-import krakenex
+from plotly.colors import get_colorscale, unlabel_rgb
 import time
 from datetime import datetime, timedelta
 import os
@@ -13,10 +13,12 @@ from sklearn.ensemble import RandomForestRegressor
 from sklearn.preprocessing import StandardScaler
 import joblib
 import json
+from concurrent.futures import ThreadPoolExecutor
 
 # הוספת נתיב למודולים
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import Config
+from modules.kraken_client import KrakenAPI
 
 # Import modules with error handling
 try:
@@ -46,6 +48,12 @@ try:
 except ImportError:
     WEBSOCKET_AVAILABLE = False    
 
+# טבלת הסרת תווים ל-clean_symbol (מעבר יחיד)
+_STRIP_TBL = str.maketrans('', '', 'XZ')
+
+# מחולל מספרים אקראיים משותף לנתוני הסימולציה
+_RNG = np.random.default_rng()
+
 # הגדרות עמוד משופרות
 st.set_page_config(
     page_title="💎 Kraken AI Trading System", 
@@ -130,6 +138,15 @@ st.markdown("""
         border: 1px solid rgba(255,255,255,0.1);
     }
     
+    .metric-row {
+        display: flex;
+        gap: 1rem;
+    }
+    
+    .metric-row > .metric-display {
+        flex: 1;
+    }
+    
     .metric-value {
         font-size: 2.5rem;
         font-weight: 700;
@@ -275,6 +292,163 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# בוני גרפים - נשמרים במטמון לפי תוכן הנתונים כדי לא לבנות מחדש בכל rerun
+@st.cache_data(ttl=60, show_spinner=False)
+def _build_portfolio_pie(portfolio_df):
+    """גרף עוגה של התפלגות הפורטפוליו"""
+    fig = go.Figure(data=[go.Pie(
+        labels=portfolio_df['שם'],
+        values=portfolio_df['שווי'],
+        hole=.4,
+        marker=dict(
+            colors=px.colors.sequential.Viridis,
+            line=dict(color='#000000', width=2)
+        ),
+        textinfo='label+percent',
+        textposition='auto',
+        hovertemplate='<b>%{label}</b><br>' +
+                      'Value: $%{value:,.2f}<br>' +
+                      'Percent: %{percent}<br>' +
+                      '<extra></extra>'
+    )])
+    
+    fig.update_layout(
+        title="Portfolio Distribution",
+        showlegend=True,
+        height=400,
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='white')
+    )
+    
+    return fig
+
+def _colorscale_rgb(z, zmax, name='RdYlGn'):
+    """מיפוי מטריצת ערכים לצבעי RGB לפי colorscale של Plotly (טווח -zmax..zmax)"""
+    scale = get_colorscale(name)
+    stops = np.array([stop for stop, _ in scale])
+    colors = np.array([unlabel_rgb(color) for _, color in scale])
+    
+    t = (z + zmax) / (2 * zmax)
+    rgb = np.stack([np.interp(t, stops, colors[:, c]) for c in range(3)], axis=-1)
+    return rgb.astype(np.uint8)
+
+def _build_market_heatmap(heatmap_df):
+    """Heatmap של שינויי מחיר - הצבעים מחושבים מראש ונשלחים כתמונה אחת"""
+    timeframes = ['1h', '24h', '7d', '30d']
+    labels = ['1 Hour', '24 Hours', '7 Days', '30 Days']
+    symbols = heatmap_df['symbol'].tolist()
+    
+    z = heatmap_df[timeframes].to_numpy().T
+    zmax = float(np.abs(z).max()) or 1.0  # סקאלה סימטרית סביב 0
+    
+    # bitmap במקום מיפוי צבעים ב-JS
+    fig = go.Figure(go.Image(
+        z=_colorscale_rgb(z, zmax),
+        zsmooth='fast',
+        hoverinfo='skip'
+    ))
+    
+    # תוויות הערכים כשכבת טקסט נפרדת; ה-markers השקופים נושאים את ה-colorbar
+    # באותה סקאלה ובאותו טווח כמו התמונה
+    rows, cols = np.indices(z.shape)
+    fig.add_trace(go.Scatter(
+        x=cols.ravel(),
+        y=rows.ravel(),
+        mode='markers+text',
+        text=[f"{v:.1f}%" for v in z.ravel()],
+        textfont=dict(size=10, color='black'),
+        marker=dict(
+            color=z.ravel(),
+            colorscale='RdYlGn',
+            cmin=-zmax,
+            cmax=zmax,
+            opacity=0,
+            showscale=True,
+            colorbar=dict(title="Change %", ticksuffix="%")
+        ),
+        customdata=[(symbols[c], labels[r]) for r, c in zip(rows.ravel(), cols.ravel())],
+        hovertemplate='<b>%{customdata[0]}</b> %{customdata[1]}: %{text}<extra></extra>',
+        showlegend=False
+    ))
+    
+    fig.update_xaxes(tickvals=list(range(len(symbols))), ticktext=symbols, title="Assets")
+    fig.update_yaxes(tickvals=list(range(len(labels))), ticktext=labels, title="Timeframe")
+    
+    fig.update_layout(
+        title="Price Change Heatmap",
+        height=300,
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='white')
+    )
+    
+    return fig
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _build_simulation_chart(values_df):
+    """גרף השוואת ביצועי אסטרטגיות (עמודה לכל אסטרטגיה)"""
+    fig = go.Figure()
+    
+    for strategy in values_df.columns:
+        fig.add_trace(go.Scatter(
+            x=values_df.index,
+            y=values_df[strategy],
+            mode='lines',
+            name=strategy,
+            line=dict(width=2)
+        ))
+    
+    fig.update_layout(
+        title="Strategy Performance Comparison",
+        xaxis_title="Date",
+        yaxis_title="Portfolio Value ($)",
+        hovermode='x unified',
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='white'),
+        height=400
+    )
+    
+    return fig
+
+@st.cache_resource
+def _get_simulation_pool():
+    """Thread pool משותף לכל התהליך עבור סימולציות אסטרטגיה"""
+    return ThreadPoolExecutor(max_workers=os.cpu_count())
+
+def _simulate_strategy(capital, duration):
+    """סימולציה של אסטרטגיה בודדת (במציאות יש להריץ סימולציה אמיתית)"""
+    dates = pd.date_range(start='today', periods=duration, freq='D')
+    
+    # יצירת נתונים אקראיים לדוגמה - מחולל נפרד לכל קריאה כדי לא להינעל על המצב הגלובלי
+    returns = np.random.default_rng().normal(0.002, 0.02, duration)
+    
+    # ריבית דריבית במערך מוקצה מראש
+    portfolio_values = np.empty(duration + 1, dtype=np.float64)
+    portfolio_values[0] = capital
+    np.cumprod(1.0 + returns, out=portfolio_values[1:])
+    portfolio_values[1:] *= capital
+    
+    final_value = float(portfolio_values[-1])
+    total_return = ((final_value - capital) / capital) * 100
+    
+    # חישוב מטריקות
+    sharpe_ratio = (returns.mean() / returns.std(ddof=1)) * np.sqrt(252)
+    running_max = np.maximum.accumulate(portfolio_values)
+    max_drawdown = ((running_max - portfolio_values) / running_max).max() * 100
+    win_rate = (returns > 0).mean() * 100
+    
+    return {
+        'dates': dates,
+        'portfolio_values': portfolio_values[1:],
+        'final_value': final_value,
+        'total_return': total_return,
+        'sharpe_ratio': sharpe_ratio,
+        'max_drawdown': max_drawdown,
+        'win_rate': win_rate
+    }
+
 class AdvancedTradingDashboard:
     """דאשבורד מסחר מתקדם עם AI"""
     
@@ -291,7 +465,7 @@ class AdvancedTradingDashboard:
         self.api = None
         if self.api_key and self.api_secret:
             try:
-                self.api = krakenex.API(self.api_key, self.api_secret)
+                self.api = KrakenAPI(self.api_key, self.api_secret)
             except Exception as e:
                 st.error(f"Failed to initialize Kraken API: {e}")
         
@@ -453,7 +627,7 @@ class AdvancedTradingDashboard:
     def clean_symbol(self, symbol):
         """ניקוי סמלי מטבעות"""
         # הסרת תווים מיוחדים
-        cleaned = symbol.upper().replace('X', '').replace('Z', '')
+        cleaned = symbol.upper().translate(_STRIP_TBL)
         
         # הסרת סיומות
         if '.' in cleaned:
@@ -609,30 +783,7 @@ class AdvancedTradingDashboard:
         
         with col1:
             # גרף עוגה אינטראקטיבי
-            fig = go.Figure(data=[go.Pie(
-                labels=portfolio_df['שם'],
-                values=portfolio_df['שווי'],
-                hole=.4,
-                marker=dict(
-                    colors=px.colors.sequential.Viridis,
-                    line=dict(color='#000000', width=2)
-                ),
-                textinfo='label+percent',
-                textposition='auto',
-                hovertemplate='<b>%{label}</b><br>' +
-                              'Value: $%{value:,.2f}<br>' +
-                              'Percent: %{percent}<br>' +
-                              '<extra></extra>'
-            )])
-            
-            fig.update_layout(
-                title="Portfolio Distribution",
-                showlegend=True,
-                height=400,
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)',
-                font=dict(color='white')
-            )
+            fig = _build_portfolio_pie(portfolio_df)
             
             st.plotly_chart(fig, use_container_width=True)
         
@@ -982,27 +1133,11 @@ class AdvancedTradingDashboard:
                 results = st.session_state.sim_results
                 
                 # תצוגת תוצאות
-                fig = go.Figure()
-                
-                for strategy, data in results.items():
-                    fig.add_trace(go.Scatter(
-                        x=data['dates'],
-                        y=data['portfolio_values'],
-                        mode='lines',
-                        name=strategy,
-                        line=dict(width=2)
-                    ))
-                
-                fig.update_layout(
-                    title="Strategy Performance Comparison",
-                    xaxis_title="Date",
-                    yaxis_title="Portfolio Value ($)",
-                    hovermode='x unified',
-                    paper_bgcolor='rgba(0,0,0,0)',
-                    plot_bgcolor='rgba(0,0,0,0)',
-                    font=dict(color='white'),
-                    height=400
-                )
+                values_df = pd.DataFrame({
+                    strategy: pd.Series(data['portfolio_values'], index=data['dates'])
+                    for strategy, data in results.items()
+                })
+                fig = _build_simulation_chart(values_df)
                 
                 st.plotly_chart(fig, use_container_width=True)
                 
@@ -1029,53 +1164,47 @@ class AdvancedTradingDashboard:
         """ניתוח שוק מתקדם"""
         st.markdown("## 📈 Advanced Market Analysis")
         
-        # Market indicators
-        col1, col2, col3, col4 = st.columns(4)
-        
+        # Market indicators - כל הכרטיסים ברינדור אחד
         # Fear & Greed Index (סימולציה)
-        fear_greed = np.random.randint(20, 80)
+        fear_greed = int(_RNG.integers(20, 80))
+        color = "#00ff88" if fear_greed > 50 else "#ff3366"
         
-        with col1:
-            color = "#00ff88" if fear_greed > 50 else "#ff3366"
-            st.markdown(f"""
+        fear_greed_card = f"""
             <div class="metric-display">
                 <div class="metric-label">Fear & Greed Index</div>
                 <div class="metric-value" style="color: {color};">{fear_greed}</div>
                 <div style="font-size: 0.9rem; opacity: 0.7;">
                     {"Greed" if fear_greed > 50 else "Fear"}
                 </div>
-            </div>
-            """, unsafe_allow_html=True)
+            </div>"""
         
-        # Market Cap
-        with col2:
-            st.markdown("""
+        market_cap_card = """
             <div class="metric-display">
                 <div class="metric-label">Total Market Cap</div>
                 <div class="metric-value">$2.1T</div>
                 <div style="font-size: 0.9rem; color: #00ff88;">+3.2%</div>
-            </div>
-            """, unsafe_allow_html=True)
+            </div>"""
         
-        # BTC Dominance
-        with col3:
-            st.markdown("""
+        btc_dominance_card = """
             <div class="metric-display">
                 <div class="metric-label">BTC Dominance</div>
                 <div class="metric-value">48.5%</div>
                 <div style="font-size: 0.9rem; color: #ff3366;">-0.8%</div>
-            </div>
-            """, unsafe_allow_html=True)
+            </div>"""
         
-        # Volume
-        with col4:
-            st.markdown("""
+        volume_card = """
             <div class="metric-display">
                 <div class="metric-label">24h Volume</div>
                 <div class="metric-value">$89B</div>
                 <div style="font-size: 0.9rem; color: #00ff88;">+12.5%</div>
-            </div>
-            """, unsafe_allow_html=True)
+            </div>"""
+        
+        st.markdown(
+            '<div class="metric-row">'
+            + fear_greed_card + market_cap_card + btc_dominance_card + volume_card
+            + '</div>',
+            unsafe_allow_html=True
+        )
         
         # Market Heatmap
         st.markdown("### 🔥 Market Heatmap")
@@ -1084,90 +1213,28 @@ class AdvancedTradingDashboard:
         symbols = ['BTC', 'ETH', 'BNB', 'XRP', 'ADA', 'SOL', 'DOT', 'DOGE', 
                    'AVAX', 'MATIC', 'LINK', 'UNI', 'ATOM', 'LTC', 'BCH']
         
-        heatmap_data = []
-        for symbol in symbols:
-            heatmap_data.append({
-                'symbol': symbol,
-                '1h': np.random.uniform(-5, 5),
-                '24h': np.random.uniform(-10, 10),
-                '7d': np.random.uniform(-20, 20),
-                '30d': np.random.uniform(-30, 30),
-                'volume': np.random.uniform(100, 1000)
-            })
-        
-        heatmap_df = pd.DataFrame(heatmap_data)
+        # קריאה וקטורית אחת ל-RNG עבור כל הטבלה
+        block = _RNG.uniform(
+            [-5, -10, -20, -30, 100],
+            [5, 10, 20, 30, 1000],
+            (len(symbols), 5)
+        )
+        heatmap_df = pd.DataFrame(block, columns=['1h', '24h', '7d', '30d', 'volume']).assign(symbol=symbols)
         
         # יצירת heatmap
-        fig = go.Figure(data=go.Heatmap(
-            z=[heatmap_df['1h'], heatmap_df['24h'], heatmap_df['7d'], heatmap_df['30d']],
-            x=heatmap_df['symbol'],
-            y=['1 Hour', '24 Hours', '7 Days', '30 Days'],
-            colorscale='RdYlGn',
-            zmid=0,
-            text=[[f"{v:.1f}%" for v in row] for row in 
-                  [heatmap_df['1h'], heatmap_df['24h'], heatmap_df['7d'], heatmap_df['30d']]],
-            texttemplate='%{text}',
-            textfont={"size": 10},
-            showscale=True,
-            colorbar=dict(
-                title=dict(
-                    text="Change %",
-                    side="right"
-                ),
-                tickmode="linear",
-                tick0=-30,
-                dtick=10
-            )
-        ))
-        
-        fig.update_layout(
-            title="Price Change Heatmap",
-            xaxis_title="Assets",
-            yaxis_title="Timeframe",
-            height=300,
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
-            font=dict(color='white')
-        )
+        fig = _build_market_heatmap(heatmap_df)
         
         st.plotly_chart(fig, use_container_width=True)
     
     def run_batch_simulations(self, capital, duration, strategies):
-        """הרצת סימולציות מרובות"""
-        results = {}
-        
-        for strategy in strategies:
-            # סימולציה של תוצאות (במציאות יש להריץ סימולציה אמיתית)
-            dates = pd.date_range(start='today', periods=duration, freq='D')
-            
-            # יצירת נתונים אקראיים לדוגמה
-            returns = np.random.normal(0.002, 0.02, duration)
-            portfolio_values = [capital]
-            
-            for r in returns:
-                portfolio_values.append(portfolio_values[-1] * (1 + r))
-            
-            final_value = portfolio_values[-1]
-            total_return = ((final_value - capital) / capital) * 100
-            
-            # חישוב מטריקות
-            returns_series = pd.Series(returns)
-            sharpe_ratio = (returns_series.mean() / returns_series.std()) * np.sqrt(252)
-            max_drawdown = ((pd.Series(portfolio_values).cummax() - pd.Series(portfolio_values)) / 
-                           pd.Series(portfolio_values).cummax()).max() * 100
-            win_rate = (returns_series > 0).sum() / len(returns_series) * 100
-            
-            results[strategy] = {
-                'dates': dates,
-                'portfolio_values': portfolio_values[1:],
-                'final_value': final_value,
-                'total_return': total_return,
-                'sharpe_ratio': sharpe_ratio,
-                'max_drawdown': max_drawdown,
-                'win_rate': win_rate
-            }
+        """הרצת סימולציות מרובות במקביל"""
+        pool = _get_simulation_pool()
+        futures = {
+            strategy: pool.submit(_simulate_strategy, capital, duration)
+            for strategy in strategies
+        }
         
-        return results
+        return {strategy: future.result() for strategy, future in futures.items()}
     
     def display_ai_status_indicator(self):
         """מחוון סטטוס AI"""
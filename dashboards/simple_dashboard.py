@@ -1,28 +1,40 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
-import krakenex
+from plotly.colors import sequential
 import numpy as np
 from datetime import datetime
 import time
 import os
 import sys
 import threading
-import queue
+import hashlib
 
 # הוספת נתיב למודולים
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import Config
+from modules.kraken_client import KrakenAPI
+from modules.symbol_cache import clean_symbol, get_usd_pairs
 
 # בדיקת זמינות WebSocket
 try:
-    from modules.market_collector import HybridMarketCollector, RealTimePriceUpdate
+    from modules.market_collector import HybridMarketCollector
     WEBSOCKET_AVAILABLE = True
 except ImportError:
     WEBSOCKET_AVAILABLE = False
     from modules.market_collector import MarketCollector
 
+# בסיס של זוג USD מתוך שם הזוג ב-Ticker (XXBTZUSD, USDTZUSD, SOLUSD, XTZUSD)
+_USD_PAIR_BASE = r'^(X[A-Z]{3}(?=ZUSD$)|USD[TC](?=ZUSD$)|.+?(?=USD$))'
+
+# מקורות מחיר - websocket ראשון, כך שקוד 0 מסמן WebSocket
+_SOURCE_DTYPE = pd.CategoricalDtype(['websocket', 'http', 'unknown'])
+
+# עיצוב סכומים עם מפריד אלפים לטבלאות התצוגה
+_USD_FMT = "${:,.2f}".format
+_PRICE_FMT = "${:,.4f}".format
+_VOLUME_FMT = "{:,.0f}".format
+
 # הגדרת עמוד
 st.set_page_config(
     page_title="💎 Kraken Portfolio Dashboard", 
@@ -76,38 +88,25 @@ st.markdown("""
 
 class KrakenDashboard:
     def __init__(self):
-        self.api = None
-        if Config.get_api_key('KRAKEN_API_KEY') and Config.get_api_key('KRAKEN_API_SECRET'):
-            self.api = krakenex.API(Config.get_api_key('KRAKEN_API_KEY'), Config.get_api_key('KRAKEN_API_SECRET'))
+        # לקוח משותף לכל הסשנים - שומר על חיבורי keep-alive בין הרצות
+        self.api = _get_api()
+        self.api_key_hash = None
+        if self.api:
+            # מפתח יציב למטמון - לעולם לא המפתח עצמו
+            self.api_key_hash = hashlib.sha256(Config.get_api_key('KRAKEN_API_KEY').encode()).hexdigest()
         
         # WebSocket support
         self.use_websocket = WEBSOCKET_AVAILABLE and os.getenv('HYBRID_MODE', 'false').lower() == 'true'
         self.hybrid_collector = None
-        self.price_queue = queue.Queue()
         
         # אתחול WebSocket אם זמין
-        if self.use_websocket and 'ws_collector' not in st.session_state:
+        if self.use_websocket:
             self._init_websocket()
     
     def _init_websocket(self):
-        """אתחול WebSocket collector"""
+        """חיבור ל-WebSocket collector המשותף (נוצר פעם אחת לכל תהליך)"""
         try:
-            symbols = ['BTC', 'ETH', 'SOL', 'ADA', 'DOT']
-            self.hybrid_collector = HybridMarketCollector(
-                symbols=symbols,
-                api_key=Config.get_api_key('KRAKEN_API_KEY'),
-                api_secret=Config.get_api_key('KRAKEN_API_SECRET')
-            )
-            
-            # הוספת callback
-            def on_price_update(update: RealTimePriceUpdate):
-                self.price_queue.put(update)
-            
-            self.hybrid_collector.add_data_callback(on_price_update)
-            
-            # התחלה בthread נפרד
-            thread = threading.Thread(target=self.hybrid_collector.start, daemon=True)
-            thread.start()
+            self.hybrid_collector = _get_hybrid_collector(('BTC', 'ETH', 'SOL', 'ADA', 'DOT'))
             
             st.session_state.ws_collector = self.hybrid_collector
             st.session_state.ws_active = True
@@ -116,24 +115,6 @@ class KrakenDashboard:
             st.error(f"Failed to initialize WebSocket: {e}")
             self.use_websocket = False
     
-    def clean_symbol(self, symbol):
-        """ניקוי סמלי מטבעות"""
-        cleaned = symbol.upper().replace('X', '').replace('Z', '')
-        if '.' in cleaned:
-            cleaned = cleaned.split('.')[0]
-        
-        replacements = {
-            'XBT': 'BTC', 'XETH': 'ETH', 'XXRP': 'XRP',
-            'XLTC': 'LTC', 'ZUSD': 'USD', 'ZEUR': 'EUR',
-            'USDTM': 'USDT', 'USDCM': 'USDC'
-        }
-        
-        for old, new in replacements.items():
-            if cleaned.startswith(old):
-                return new
-                
-        return cleaned
-    
     def get_websocket_prices(self):
         """קבלת מחירים מ-WebSocket"""
         if not self.use_websocket or not st.session_state.get('ws_collector'):
@@ -144,92 +125,133 @@ class KrakenDashboard:
         except:
             return {}
     
+    def _parse_ticker_prices(self, ticker_result, ws_prices, usd_pairs):
+        """עיבוד וקטורי של תשובת Ticker - מחירי WebSocket גוברים על HTTP"""
+        tick = pd.DataFrame.from_dict(ticker_result, orient='index')
+        if tick.empty or 'c' not in tick:
+            return {}
+        
+        # מיפוי זוגות USD מהמטמון; בלי מטמון - פענוח שם הזוג
+        if usd_pairs:
+            tick = tick[tick.index.isin(list(usd_pairs))]
+            symbols = tick.index.map(usd_pairs)
+        else:
+            tick = tick[tick.index.str.endswith('USD')]
+            symbols = tick.index.str.extract(_USD_PAIR_BASE, expand=False).map(clean_symbol)
+        
+        current = pd.to_numeric(tick['c'].str[0], errors='coerce')
+        open_price = current
+        if 'o' in tick:
+            open_price = pd.to_numeric(tick['o'], errors='coerce').fillna(current)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            change = np.where(open_price > 0, (current - open_price) / open_price * 100, 0)
+        
+        http_df = pd.DataFrame({
+            'symbol': symbols,
+            'price': current.to_numpy(),
+            'change_24h': change,
+            'source': 'http'
+        })
+        # שורות שלא פוענחו נופלות כאן; הזוג הראשון לכל סמל נשמר
+        http_df = http_df.dropna(subset=['price']).drop_duplicates('symbol').set_index('symbol')
+        
+        if ws_prices:
+            ws_df = pd.DataFrame.from_dict(self._ws_price_table(ws_prices), orient='index')
+            http_df = ws_df.reindex(http_df.index).combine_first(http_df)
+        
+        return http_df.to_dict('index')
+    
+    @staticmethod
+    def _ws_price_table(ws_prices):
+        """המרת עדכוני WebSocket לטבלת המחירים של הדשבורד"""
+        return {
+            symbol: {'price': update.price, 'change_24h': update.change_24h_pct, 'source': 'websocket'}
+            for symbol, update in ws_prices.items()
+        }
+    
+    @staticmethod
+    def _ticker_pairs(symbols, usd_pairs):
+        """זוגות ה-USD של הנכסים המוחזקים עבור פרמטר pair, או None כשאין מיפוי"""
+        if not symbols or not usd_pairs:
+            return None
+        
+        pairs = sorted(pair for pair, symbol in usd_pairs.items() if symbol in symbols)
+        return ','.join(pairs) or None
+    
     def get_portfolio_data(self):
         """שליפת נתוני פורטפוליו עם תמיכת WebSocket"""
         if not self.api:
             return None, None, None
         
+        return self._load_portfolio_data()
+    
+    def _load_portfolio_data(self):
+        """שליפת נתוני פורטפוליו - יתרות ומחירים במטמונים נפרדים"""
         try:
-            # יתרות
-            balance_resp = self.api.query_private('Balance')
-            if balance_resp.get('error'):
-                st.error(f"Error: {balance_resp['error']}")
-                return None, None, None
-            
-            balances = balance_resp.get('result', {})
+            # יתרות (שגיאת API עולה כחריגה ומטופלת למטה)
+            balances = _cached_balance(self.api, self.api_key_hash)
             
             # מחירים - העדפה ל-WebSocket
             ws_prices = self.get_websocket_prices() if self.use_websocket else {}
             
-            # HTTP fallback for missing prices
-            ticker_resp = self.api.query_public('Ticker')
+            # נכסים שדורשים מחיר
+            needed = {
+                clean_symbol(asset) for asset, amount in balances.items()
+                if float(amount) >= 0.0001
+            } - {'USD', 'EUR', 'GBP'}
+            
+            # עיבוד מחירים - HTTP fallback רק כשה-WebSocket לא מכסה את כל הנכסים;
+            # בלי נכסים לתמחור (חשבון ריק / פיאט בלבד) אין בקשת Ticker בכלל
+            if not needed:
+                prices = {}
+            elif ws_prices and needed.issubset(ws_prices.keys()):
+                prices = self._ws_price_table(ws_prices)
+            else:
+                # מיפוי הזוגות נקבע פעם אחת לכל רענון ומשמש גם לבקשה וגם לפענוח
+                usd_pairs = get_usd_pairs(self.api)
+                ticker_resp = _cached_ticker(self.api, self._ticker_pairs(needed, usd_pairs))
+                prices = {}
+                if 'result' in ticker_resp:
+                    prices = self._parse_ticker_prices(ticker_resp['result'], ws_prices, usd_pairs)
             
-            # עיבוד נתונים
-            portfolio = []
-            total_value_usd = 0
-            prices = {}
+            # עיבוד יתרות - Series אחת לפי סמל נקי (סמלים כפולים נשמרים כשורות נפרדות)
+            bal = pd.Series(
+                [float(amount) for amount in balances.values()],
+                index=[clean_symbol(asset) for asset in balances],
+                dtype=np.float64
+            )
+            bal = bal[bal >= 0.0001]
+            
+            # פיאט
+            fiat_mask = bal.index.isin(['USD', 'EUR', 'GBP'])
+            fiat_total = bal[fiat_mask].sum()
+            crypto = bal[~fiat_mask]
+            
+            # קריפטו - join אחד מול טבלת המחירים
+            prices_df = pd.DataFrame.from_dict(prices, orient='index', columns=['price', 'change_24h', 'source'])
+            port = crypto.rename('Amount').to_frame().join(prices_df)
             
-            # עיבוד מחירים
-            if 'result' in ticker_resp:
-                for pair, info in ticker_resp['result'].items():
-                    if 'USD' in pair:
-                        symbol = self.clean_symbol(pair.replace('USD', '').replace('ZUSD', ''))
-                        
-                        # בדיקה אם יש מחיר WebSocket עדכני יותר
-                        if symbol in ws_prices:
-                            ws_data = ws_prices[symbol]
-                            prices[symbol] = {
-                                'price': ws_data.price,
-                                'change_24h': ws_data.change_24h_pct,
-                                'source': 'websocket'
-                            }
-                        elif symbol not in prices:
-                            try:
-                                current = float(info['c'][0])
-                                open_price = float(info.get('o', current))
-                                change = ((current - open_price) / open_price * 100) if open_price > 0 else 0
-                                
-                                prices[symbol] = {
-                                    'price': current,
-                                    'change_24h': change,
-                                    'source': 'http'
-                                }
-                            except:
-                                continue
+            stable_mask = port.index.isin(['USDT', 'USDC'])
+            port.loc[stable_mask, 'price'] = port.loc[stable_mask, 'price'].fillna(1.0)
+            port = port[port['price'] > 0]
+            port['Value'] = port['Amount'] * port['price']
             
-            # עיבוד יתרות
-            for asset, amount in balances.items():
-                amount = float(amount)
-                if amount < 0.0001:
-                    continue
-                
-                symbol = self.clean_symbol(asset)
-                
-                # פיאט
-                if symbol in ['USD', 'EUR', 'GBP']:
-                    total_value_usd += amount
-                    continue
-                
-                # קריפטו
-                price_info = prices.get(symbol, {'price': 1.0 if symbol in ['USDT', 'USDC'] else 0})
-                price = price_info['price']
-                
-                if price > 0:
-                    value = amount * price
-                    portfolio.append({
-                        'Symbol': symbol,
-                        'Amount': amount,
-                        'Price': price,
-                        'Value': value,
-                        'Change': price_info.get('change_24h', 0),
-                        'Source': price_info.get('source', 'unknown')
-                    })
-                    total_value_usd += value
+            total_value_usd = float(fiat_total) + float(port['Value'].sum())
             
             # מיון וחישוב אחוזים
-            if portfolio:
-                df = pd.DataFrame(portfolio).sort_values('Value', ascending=False)
+            if not port.empty:
+                df = pd.DataFrame({
+                    'Symbol': pd.Categorical(port.index),
+                    'Amount': port['Amount'].to_numpy(),
+                    'Price': port['price'].to_numpy(dtype=np.float64),
+                    'Value': port['Value'].to_numpy(dtype=np.float64),
+                    'Change': port['change_24h'].fillna(0).to_numpy(),
+                    'Source': pd.Categorical(port['source'].fillna('unknown'), dtype=_SOURCE_DTYPE)
+                }).sort_values('Value', ascending=False)
                 df['Percentage'] = (df['Value'] / total_value_usd * 100)
+                # אייקון מקור לתצוגה - מחושב פעם אחת כאן ולא בכל הרצה של הדף
+                df['📡'] = np.where(df['Source'].cat.codes.to_numpy() == 0, '⚡', '📊')
                 return df, total_value_usd, prices
             
             return pd.DataFrame(), total_value_usd, prices
@@ -238,6 +260,115 @@ class KrakenDashboard:
             st.error(f"Error: {str(e)}")
             return None, None, None
 
+@st.cache_resource(show_spinner=False)
+def _get_api():
+    """לקוח Kraken יחיד לתהליך, או None אם אין מפתחות"""
+    key = Config.get_api_key('KRAKEN_API_KEY')
+    secret = Config.get_api_key('KRAKEN_API_SECRET')
+    return KrakenAPI(key, secret) if key and secret else None
+
+@st.cache_resource(show_spinner=False)
+def _get_hybrid_collector(symbols):
+    """WebSocket collector יחיד לתהליך - ה-thread שלו מופעל פעם אחת בלבד"""
+    collector = HybridMarketCollector(
+        symbols=list(symbols),
+        api_key=Config.get_api_key('KRAKEN_API_KEY'),
+        api_secret=Config.get_api_key('KRAKEN_API_SECRET')
+    )
+    
+    # הדשבורד קורא מחירים דרך get_latest_prices() בלבד - אין צורך ב-callback לכל tick
+    threading.Thread(target=collector.start, daemon=True).start()
+    return collector
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_balance(_api, api_key_hash):
+    """יתרות - משתנות רק במסחר, ולכן נשמרות דקה (המפתח הוא hash של מפתח ה-API)"""
+    resp = _api.query_private('Balance')
+    if resp.get('error'):
+        # שגיאה לא נשמרת במטמון
+        raise RuntimeError(resp['error'])
+    return resp.get('result', {})
+
+@st.cache_data(ttl=5, show_spinner=False)
+def _cached_ticker(_api, pairs):
+    """מחירי Ticker - מטמון קצר לפי רשימת הזוגות (None = כל הזוגות)"""
+    if pairs:
+        return _api.query_public('Ticker', {'pair': pairs})
+    return _api.query_public('Ticker')
+
+def _portfolio_metrics(portfolio_df):
+    """מטריקות הסיכום (מספר נכסים, שינוי ממוצע, נכס מוביל) - מחושבות מחדש רק כשהנתונים משתנים"""
+    if portfolio_df.empty:
+        return 0, None, None
+    
+    key = int(pd.util.hash_pandas_object(portfolio_df).sum())
+    cached = st.session_state.get('_metrics_cache')
+    if cached and cached[0] == key:
+        return cached[1]
+    
+    metrics = (len(portfolio_df), float(portfolio_df['Change'].mean()), portfolio_df['Symbol'].iat[0])
+    st.session_state['_metrics_cache'] = (key, metrics)
+    return metrics
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _build_distribution_pie(portfolio_df):
+    """בניית גרף התפלגות - נשמר במטמון לפי תוכן ה-DataFrame"""
+    # go.Pie ישירות מהמערכים - בלי צינור העיבוד של plotly express
+    fig = go.Figure(go.Pie(
+        labels=portfolio_df['Symbol'].to_numpy(),
+        values=portfolio_df['Value'].to_numpy(),
+        hole=0.4,
+        textposition='inside',
+        textinfo='percent+label',
+        hovertemplate='<b>%{label}</b><br>Value: $%{value:,.2f}<br>Percent: %{percent}<extra></extra>'
+    ))
+    
+    fig.update_layout(
+        piecolorway=sequential.Viridis,
+        showlegend=True,
+        height=400,
+        margin=dict(l=0, r=0, t=0, b=0)
+    )
+    
+    return fig
+
+# rerun חלקי של פאנל (st.fragment ב-Streamlit 1.37+, experimental_fragment ב-1.33+)
+_fragment = getattr(st, 'fragment', None) or getattr(st, 'experimental_fragment', None)
+
+def _live_fragment(run_every):
+    """הרצה מחדש של פאנל בודד כל run_every שניות; בגרסאות ישנות הפאנל רץ עם הדף כולו"""
+    if _fragment is None:
+        return lambda func: func
+    return _fragment(run_every=run_every)
+
+@_live_fragment(run_every=5)
+def _market_prices_panel(dashboard):
+    """טבלת מחירי WebSocket - מתעדכנת לבד בלי להריץ מחדש את שאר הדף"""
+    if dashboard.use_websocket:
+        ws_prices = dashboard.get_websocket_prices()
+        if ws_prices:
+            st.markdown("### ⚡ Real-Time WebSocket Feed")
+            
+            # יצירת DataFrame מנתוני WebSocket - tuples במקום dict לכל שורה
+            ws_df = pd.DataFrame.from_records(
+                [(symbol, u.price, u.change_24h_pct, u.bid, u.ask, u.volume, u.timestamp)
+                 for symbol, u in ws_prices.items()],
+                columns=['Symbol', 'Price', 'Change 24h', 'Bid', 'Ask', 'Volume', 'Last Update']
+            )
+            # פורמט printf של column_config לא תומך במפריד אלפים - עמודות הסכומים כמחרוזות
+            for column in ('Price', 'Bid', 'Ask'):
+                ws_df[column] = ws_df[column].map(_USD_FMT)
+            ws_df['Volume'] = ws_df['Volume'].map(_VOLUME_FMT)
+            st.dataframe(
+                ws_df,
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    "Change 24h": st.column_config.NumberColumn(format="%+.2f%%"),
+                    "Last Update": st.column_config.DatetimeColumn(format="HH:mm:ss")
+                }
+            )
+
 def main():
     st.title("💎 Kraken Portfolio Dashboard")
     
@@ -280,27 +411,22 @@ def main():
     st.markdown("## 📊 Portfolio Overview")
     
     col1, col2, col3, col4 = st.columns(4)
+    num_assets, avg_change, top_asset = _portfolio_metrics(portfolio_df)
     
     with col1:
         st.metric("Total Value", f"${total_value:,.2f}")
     
     with col2:
-        num_assets = len(portfolio_df) if not portfolio_df.empty else 0
         st.metric("Assets", num_assets)
     
     with col3:
-        if not portfolio_df.empty:
-            avg_change = portfolio_df['Change'].mean()
+        if avg_change is not None:
             st.metric("Avg 24h Change", f"{avg_change:+.2f}%", delta=f"{avg_change:+.2f}%")
         else:
             st.metric("Avg 24h Change", "0%")
     
     with col4:
-        if not portfolio_df.empty:
-            top_asset = portfolio_df.iloc[0]['Symbol']
-            st.metric("Top Asset", top_asset)
-        else:
-            st.metric("Top Asset", "N/A")
+        st.metric("Top Asset", top_asset if top_asset is not None else "N/A")
     
     # תצוגת פורטפוליו עם אינדיקטור מקור נתונים
     if not portfolio_df.empty:
@@ -309,35 +435,28 @@ def main():
         with col1:
             st.markdown("### 💰 Holdings")
             
-            # הוספת עמודת מקור נתונים
-            display_df = portfolio_df.copy()
-            
-            # אייקון לפי מקור
-            display_df['📡'] = display_df['Source'].apply(
-                lambda x: '⚡' if x == 'websocket' else '📊'
-            )
-            
-            display_df['Price'] = display_df['Price'].apply(lambda x: f"${x:,.4f}")
-            display_df['Value'] = display_df['Value'].apply(lambda x: f"${x:,.2f}")
-            display_df['Amount'] = display_df['Amount'].apply(lambda x: f"{x:.6f}")
-            display_df['Percentage'] = display_df['Percentage'].apply(lambda x: f"{x:.1f}%")
-            display_df['Change'] = display_df['Change'].apply(lambda x: f"{x:+.2f}%")
-            
-            # הסרת עמודת Source המקורית
-            display_df = display_df.drop('Source', axis=1)
-            
+            # עמודת Source המקורית מוסתרת דרך column_order; מחיר ושווי כמחרוזות עם
+            # מפריד אלפים (פורמט printf של column_config לא תומך בו) - portfolio_df נשאר מספרי
             st.dataframe(
-                display_df,
+                portfolio_df.assign(
+                    Price=portfolio_df['Price'].map(_PRICE_FMT),
+                    Value=portfolio_df['Value'].map(_USD_FMT)
+                ),
                 use_container_width=True,
                 hide_index=True,
+                column_order=['Symbol', 'Amount', 'Price', 'Value', 'Change', 'Percentage', '📡'],
                 column_config={
+                    # שאר העמודות המספריות מעוצבות בצד הלקוח
+                    "Amount": st.column_config.NumberColumn(format="%.6f"),
+                    "Percentage": st.column_config.NumberColumn(format="%.1f%%"),
                     "📡": st.column_config.TextColumn(
                         "Source",
                         help="⚡ = WebSocket (Real-time), 📊 = HTTP"
                     ),
-                    "Change": st.column_config.TextColumn(
+                    "Change": st.column_config.NumberColumn(
                         "24h Change",
-                        help="24 hour price change"
+                        help="24 hour price change",
+                        format="%+.2f%%"
                     )
                 }
             )
@@ -349,52 +468,14 @@ def main():
             st.markdown("### 📊 Distribution")
             
             # Pie chart
-            fig = px.pie(
-                portfolio_df,
-                values='Value',
-                names='Symbol',
-                hole=0.4,
-                color_discrete_sequence=px.colors.sequential.Viridis
-            )
-            
-            fig.update_traces(
-                textposition='inside',
-                textinfo='percent+label',
-                hovertemplate='<b>%{label}</b><br>Value: $%{value:,.2f}<br>Percent: %{percent}<extra></extra>'
-            )
-            
-            fig.update_layout(
-                showlegend=True,
-                height=400,
-                margin=dict(l=0, r=0, t=0, b=0)
-            )
+            fig = _build_distribution_pie(portfolio_df)
             
             st.plotly_chart(fig, use_container_width=True)
     
     # נתוני שוק עם WebSocket
     st.markdown("## 📈 Market Prices")
     
-    if dashboard.use_websocket:
-        ws_prices = dashboard.get_websocket_prices()
-        if ws_prices:
-            st.markdown("### ⚡ Real-Time WebSocket Feed")
-            
-            # יצירת DataFrame מנתוני WebSocket
-            ws_data = []
-            for symbol, update in ws_prices.items():
-                ws_data.append({
-                    'Symbol': symbol,
-                    'Price': f"${update.price:,.2f}",
-                    'Change 24h': f"{update.change_24h_pct:+.2f}%",
-                    'Bid': f"${update.bid:,.2f}",
-                    'Ask': f"${update.ask:,.2f}",
-                    'Volume': f"{update.volume:,.0f}",
-                    'Last Update': update.timestamp.strftime('%H:%M:%S')
-                })
-            
-            if ws_data:
-                ws_df = pd.DataFrame(ws_data)
-                st.dataframe(ws_df, use_container_width=True, hide_index=True)
+    _market_prices_panel(dashboard)
     
     # פוטר עם סטטיסטיקות
     st.markdown("---")
@@ -9,22 +9,63 @@ import os
 import sys
 import time
 import logging
-import argparse
-import threading
-import subprocess
-from datetime import datetime
+import functools
+import itertools
+import contextlib
+import importlib
+import importlib.util
 from typing import Dict, List, Optional
-import json
 
 # הגדרת נתיבים תקינים
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 MODULES_DIR = os.path.join(BASE_DIR, 'modules')
 DASHBOARDS_DIR = os.path.join(BASE_DIR, 'dashboards')
 
-# הוספת נתיבים ל-Python path
-for path in [BASE_DIR, MODULES_DIR, DASHBOARDS_DIR]:
-    if path not in sys.path:
-        sys.path.insert(0, path)
+# טבלת זמינות אחת לכל בדיקות "האם המודול קיים" - name -> bool
+_AVAILABILITY = {}
+
+# מודולים שהייבוא שלהם כבר נכשל - לא מריצים שוב את שרשרת ה-finders
+_FAILED_IMPORTS = set()
+
+def try_import(module_name: str):
+    """ייבוא מודול אופציונלי - מחזיר None אם אינו זמין (התוצאה השלילית נשמרת)"""
+    if module_name in _FAILED_IMPORTS:
+        return None
+    try:
+        return importlib.import_module(module_name)
+    except ImportError as e:
+        logger.warning(f"Optional module {module_name} not available: {e}")
+        _FAILED_IMPORTS.add(module_name)
+        _AVAILABILITY[module_name] = False
+        return None
+
+def cached_import(module_name: str, item_name: str):
+    """כמו from module import item, אבל בודק קודם ב-sys.modules ומייבא רק בהחמצה
+    
+    מודול שעדיין באמצע אתחול (import מקביל) מיובא מחדש כדי לקבל אותו שלם
+    """
+    modules = sys.modules
+    module = modules.get(module_name)
+    if module is None or getattr(getattr(module, '__spec__', None), '_initializing', False):
+        module = try_import(module_name)
+        if module is None:
+            raise ImportError(f"No module named '{module_name}'", name=module_name)
+    try:
+        return getattr(module, item_name)
+    except AttributeError:
+        raise ImportError(f"cannot import name '{item_name}' from '{module_name}'",
+                          name=module_name) from None
+
+def module_available(name: str) -> bool:
+    """האם מודול ניתן לייבוא, בלי להריץ אותו (התוצאה נשמרת ב-_AVAILABILITY)
+    
+    רק הקבצים מאותרים - תלות עקיפה שבורה תתגלה בייבוא עצמו (try_import)
+    """
+    available = _AVAILABILITY.get(name)
+    if available is None:
+        available = name in sys.modules or importlib.util.find_spec(name) is not None
+        _AVAILABILITY[name] = available
+    return available
 
 # ייבוא מודולים עם טיפול בשגיאות
 try:
@@ -33,27 +74,330 @@ except ImportError:
     print("❌ Config module not found. Please ensure config.py exists.")
     sys.exit(1)
 
-# ייבוא המודול ההיברידי החדש
-try:
-    from modules.hybrid_market_collector import HybridMarketCollector, run_hybrid_collector, RealTimePriceUpdate
-    HYBRID_AVAILABLE = True
+# המודול ההיברידי - בטעינה רק מאתרים את הקבצים; הייבוא עצמו (pandas, websockets,
+# requests) נעשה ב-_load_hybrid_collector כשמצב היברידי מופעל בפועל
+_hybrid_missing = next(
+    (name for name in ('websockets', 'modules.hybrid_market_collector')
+     if not module_available(name)),
+    None
+)
+HYBRID_AVAILABLE = _hybrid_missing is None
+if HYBRID_AVAILABLE:
     print("✅ Hybrid WebSocket + HTTP collector available")
-except ImportError as e:
-    print(f"⚠️  Hybrid collector not available: {e}")
-    HYBRID_AVAILABLE = False
+else:
+    print(f"⚠️  Hybrid collector not available: No module named '{_hybrid_missing}'")
     # Fallback to original collector
-    try:
-        from modules.market_collector import MarketCollector, run_collector
-    except ImportError:
+    if not module_available('modules.market_collector'):
         print("❌ No market collector available!")
         sys.exit(1)
 
+def _load_hybrid_collector():
+    """ייבוא המודול ההיברידי בשימוש הראשון - None אם הייבוא נכשל
+    
+    כישלון (למשל תלות עקיפה שבורה) מכבה את HYBRID_AVAILABLE, כך שהתפריט
+    מסמן את האפשרויות ההיברידיות כלא זמינות
+    """
+    global HYBRID_AVAILABLE
+    module = try_import('modules.hybrid_market_collector')
+    if module is None:
+        HYBRID_AVAILABLE = False
+    return module
+
+class _LazyLogger:
+    """לוגר שנוצר (כולל קבצי הלוג) רק בשימוש הראשון"""
+    
+    def __init__(self, name: str):
+        self._name = name
+        self._real = None
+    
+    def __getattr__(self, attr):
+        if self._real is None:
+            self._real = Config.setup_logging(self._name)
+        return getattr(self._real, attr)
+
 # הגדרת לוגר
-logger = Config.setup_logging('main')
+logger = _LazyLogger('main')
+
+# דוח הסטטיסטיקות של לולאת הניטור ההיברידית - נכתב ב-write אחד
+_HYBRID_STATS_TEMPLATE = (
+    "\n[{time}] 📊 Hybrid Collection Stats:\n"
+    "  • Total Updates: {total_updates}\n"
+    "  • WebSocket Updates: {websocket_updates}\n"
+    "  • HTTP Updates: {http_updates}\n"
+    "  • Updates/Min: {updates_per_minute:.1f}\n"
+    "  • WebSocket Status: {websocket_status}\n"
+    "  • Active Symbols: {active_symbols}/{total_symbols}\n"
+)
+
+def _sampled_price_print(price_update, counter: List[int], stride: int):
+    """callback לעדכוני מחיר - מדפיס רק כל stride עדכונים (counter הוא מונה משותף)"""
+    counter[0] += 1
+    count = counter[0]
+    if count % stride:
+        return
+    print(f"💰 [{count}] {price_update.symbol}: "
+          f"${price_update.price:,.2f} ({price_update.change_24h_pct:+.2f}%) "
+          f"[{price_update.source}]")
+
+# תחילית הפקודה להרצת דאשבורד streamlit - נבנית פעם אחת
+_STREAMLIT_RUN = (sys.executable, "-m", "streamlit", "run")
+
+# נתיבי הדאשבורדים שנמצאו - שם קובץ -> נתיב (None אם לא נמצא); נבדק פעם אחת לכל ריצה
+_DASHBOARD_PATHS = {}
+
+def _resolve_dashboard(filename: str) -> Optional[str]:
+    """איתור קובץ דאשבורד ב-dashboards/ ואחר כך בתיקיית הבסיס (התוצאה נשמרת)"""
+    try:
+        return _DASHBOARD_PATHS[filename]
+    except KeyError:
+        pass
+    
+    candidates = (os.path.join(DASHBOARDS_DIR, filename), os.path.join(BASE_DIR, filename))
+    path = _DASHBOARD_PATHS[filename] = next(
+        (candidate for candidate in candidates if os.path.isfile(candidate)), None
+    )
+    return path
+
+# תיקיות שנבדקות באבחון מערכת הקבצים, וקובץ בדיקת הכתיבה - נתיבים קבועים
+_CHECKED_DIRS = ('data', 'logs', 'modules', 'dashboards')
+_WRITE_TEST_FILE = os.path.join(Config.DATA_DIR, 'test_write.tmp')
+
+# קבצי הנתונים שמוצגים בשורת הסטטוס של התפריט
+_STATUS_DATA_FILES = ('market_live.csv', 'market_history.csv', 'news_feed.csv')
+
+# תמונת המצב האחרונה של תיקיית הנתונים - (זמן monotonic, מילון)
+_data_dir_snapshot = None
+
+def _snapshot_data_dir(max_age: float = 0.0) -> Dict[str, os.stat_result]:
+    """שם -> stat לכל קובץ בתיקיית הנתונים, בקריאת תיקייה אחת
+    
+    עם max_age > 0 מוחזרת תמונת המצב הקודמת אם היא צעירה מ-max_age שניות
+    """
+    global _data_dir_snapshot
+    now = time.monotonic()
+    if max_age > 0 and _data_dir_snapshot and now - _data_dir_snapshot[0] < max_age:
+        return _data_dir_snapshot[1]
+    
+    try:
+        with os.scandir(Config.DATA_DIR) as entries:
+            snapshot = {e.name: e.stat() for e in entries if e.is_file()}
+    except FileNotFoundError:
+        snapshot = {}
+    
+    _data_dir_snapshot = (now, snapshot)
+    return snapshot
+
+# באנר פתיחה - נבנה פעם אחת ומתמלא ב-print_banner
+_BANNER_TEMPLATE = """
+╔═══════════════════════════════════════════════════════════════╗
+║                💎 Kraken Trading Bot v{version} 💎                ║
+║                                                               ║
+║        🤖 Advanced AI-Powered Crypto Trading System          ║
+║            {hybrid_status:<20} ⚡ Real-Time Data            ║
+║                                                               ║
+║  📊 Live Prices  🧠 ML Predictions  ⚡ Auto Trading         ║
+╚═══════════════════════════════════════════════════════════════╝
+        """
+
+# קו ההפרדה של התפריט הראשי
+_MENU_RULE = "═" * 60
+
+# סימון כיוון השינוי לפי הסימן (-1/0/+1), ושורות המחיר בתצוגת הניתוח (היברידי / קלאסי)
+_SIGN_ICON = ("🔴", "⚪", "🟢")
+_HYBRID_ROW_FMT = "{0:6} | ${1:>12,.2f} | {2:>+6.2f}% | Vol: {3:>12,.0f} | [{4}]".format
+_ROW_FMT = "{sym} {s:6} | ${p:>10,.2f} | {c:>+6.2f}% | Vol: ${v:>10,.0f}".format
+
+# תפריט ותוכן התיעוד - נבנים פעם אחת בטעינת המודול
+_DOCS_MENU = (
+    ("1", "🚀 Quick Start Guide"),
+    ("2", "📊 Dashboard User Guide"),
+    ("3", "🤖 AI Trading Features"),
+    ("4", "⚙️  API Configuration"),
+    ("5", "🌟 Hybrid Mode Guide (WebSocket + HTTP)"),
+    ("6", "🧪 Running Simulations"),
+    ("7", "🔧 Troubleshooting Guide"),
+    ("8", "📈 Market Analysis Tools"),
+    ("9", "🔒 Security Best Practices")
+)
+
+_HYBRID_GUIDE_TEXT = """
+WHAT IS HYBRID MODE?
+• Combines WebSocket real-time feeds with HTTP API calls
+• WebSocket: Live price updates (sub-second latency)
+• HTTP: Account data, trading history, fallback
+• Best of both worlds: Speed + Reliability
+
+ADVANTAGES:
+• ⚡ Real-time price updates (no 30-second delays)
+• 📉 Lower bandwidth usage
+• 🔄 Automatic fallback to HTTP if WebSocket fails
+• 💰 Instant trading signal generation
+• 📊 Better market analysis with live data
+
+HOW TO USE:
+1. Choose "Hybrid Data Collection" from main menu
+2. System automatically connects to WebSocket feeds
+3. HTTP used for account data and fallback
+4. Dashboard shows real-time updates
+
+REQUIREMENTS:
+• Python websockets package: pip install websockets
+• Stable internet connection
+• Kraken API keys (optional but recommended)
+
+TROUBLESHOOTING:
+• If WebSocket fails, system falls back to HTTP
+• Check firewall settings for WebSocket connections
+• Monitor logs for connection status
+
+PERFORMANCE:
+• Expect 10-100x faster price updates
+• Reduced server load on Kraken
+• More accurate trading signals
+        """
+
+_TROUBLESHOOTING_TEXT = """
+COMMON ISSUES:
+
+1. WebSocket Connection Failed:
+   → Check internet connection
+   → Verify firewall allows WebSocket connections
+   → Try restarting the hybrid collector
+   → Check logs for detailed error messages
+
+2. "Hybrid collector not available":
+   → Install websockets: pip install websockets
+   → Restart the application
+   → Check Python version (3.8+ recommended)
+
+3. WebSocket connects but no data:
+   → Check symbol subscriptions
+   → Verify Kraken WebSocket service status
+   → System will fallback to HTTP automatically
+
+4. High CPU usage with WebSocket:
+   → Reduce number of tracked symbols
+   → Check for memory leaks in logs
+   → Consider using HTTP-only mode temporarily
+
+5. Data inconsistencies:
+   → WebSocket and HTTP data may have slight differences
+   → This is normal due to timing
+   → Hybrid system prioritizes WebSocket data
+
+6. API rate limiting:
+   → WebSocket reduces API calls significantly
+   → HTTP fallback respects rate limits
+   → Account data still uses HTTP (unavoidable)
+
+HYBRID-SPECIFIC DEBUGGING:
+• Use Debug menu option "Test Hybrid Data Collection"
+• Check WebSocket connection with "Test WebSocket Connection"
+• Monitor logs for connection status changes
+• Watch for fallback messages in console
+
+GETTING HELP:
+• Enable debug logging for detailed information
+• Check system diagnostics (debug option)
+• WebSocket issues are often network-related
+• Consider running in HTTP-only mode as fallback
+        """
+
+_QUICK_START_TEXT = """
+CURRENT MODE: {mode_info}
+
+1. INSTALLATION:
+   • Ensure Python 3.8+ is installed
+   • Run: pip install -r requirements.txt
+   • For Hybrid Mode: pip install websockets
+   • Copy .env.example to .env
+
+2. API CONFIGURATION:
+   • Get Kraken API key from kraken.com
+   • Add your keys to .env file:
+     KRAKEN_API_KEY=your_key_here
+     KRAKEN_API_SECRET=your_secret_here
+
+3. FIRST RUN:
+   • Test system: python main.py → option 10 (Debug)
+   • Start dashboard: python main.py → option 1
+   • Access at: http://localhost:8501
+
+4. DATA COLLECTION:
+   • Hybrid Mode: python main.py → option 2 (Real-time)
+   • Classic Mode: python main.py → option 3 (30s intervals)
+
+5. ADVANCED FEATURES:
+   • AI Trading: option 4 (requires OpenAI API key)
+   • Full System: option 5 (Hybrid) or option 6 (Classic)
+   • Simulations: option 6
+
+6. MONITORING:
+   • Check logs/ directory for detailed information
+   • Use debug options for troubleshooting
+   • Monitor system resources with hybrid mode
+        """
+
+# עמודי המדריכים המלאים (כותרת + קו + תוכן) - נכתבים ב-write אחד
+_HYBRID_UNAVAILABLE_PAGE = (
+    "\n❌ Hybrid Mode Not Available\n"
+    "Missing: websockets package\n"
+    "Install: pip install websockets\n"
+)
+_HYBRID_GUIDE_PAGE = f"\n🌟 Hybrid Mode Guide (WebSocket + HTTP)\n{'=' * 50}\n{_HYBRID_GUIDE_TEXT}\n"
+_TROUBLESHOOTING_PAGE = f"\n🔧 Troubleshooting Guide (Hybrid Mode)\n{'=' * 50}\n{_TROUBLESHOOTING_TEXT}\n"
+# שורת המצב ({mode_info}) נקבעת בהצגה - HYBRID_AVAILABLE יכול לכבות אחרי הטעינה
+_QUICK_START_PAGE = f"\n🚀 Quick Start Guide\n{'=' * 40}\n{_QUICK_START_TEXT}\n"
 
 class EnhancedTradingBotManager:
     """מנהל ראשי למערכת הבוט עם תמיכה היברידית"""
     
+    # אפשרויות התפריט: (מקש, תיאור, פעולה, דרישה) - דרישה היא 'always', 'hybrid' או מפתח features
+    _MENU_DEFS = (
+        ("1", "🚀 Quick Start - Simple Dashboard", "simple_dashboard", "always"),
+        ("2", "📊 Hybrid Data Collection (WebSocket + HTTP)", "hybrid_collect_data", "hybrid"),
+        ("3", "📈 Classic Data Collection (HTTP Only)", "collect_data", "always"),
+        ("4", "🤖 AI Trading Dashboard", "ai_dashboard", "ai_features"),
+        ("5", "🔄 Full Hybrid System", "hybrid_full_system", "hybrid"),
+        ("6", "🧪 Trading Simulations", "simulations", "simulations"),
+        ("7", "📈 Market Analysis Tools", "analysis", "analysis"),
+        ("8", "⚙️  System Configuration", "settings", "always"),
+        ("9", "🪙 Symbol & Asset Manager", "symbols", "data_collection"),
+        ("10", "🔧 Debug & Diagnostics", "debug", "always"),
+        ("11", "📚 Help & Documentation", "docs", "always"),
+        ("0", "🚪 Exit System", "exit", "always")
+    )
+    _CHOICE_MAP = {key: action for key, _, action, _ in _MENU_DEFS}
+    
+    # פעולה -> שם המתודה שמטפלת בה ('exit' ו-'invalid' מטופלים ב-run)
+    _ACTION_HANDLERS = (
+        ("simple_dashboard", "run_simple_dashboard"),
+        ("hybrid_collect_data", "run_hybrid_data_collection"),
+        ("collect_data", "run_data_collection"),
+        ("ai_dashboard", "run_ai_dashboard"),
+        ("hybrid_full_system", "run_hybrid_full_system"),
+        ("simulations", "run_simulations"),
+        ("analysis", "show_analysis"),
+        ("settings", "show_settings"),
+        ("symbols", "_update_trading_symbols"),
+        ("debug", "run_debug"),
+        ("docs", "show_docs")
+    )
+    
+    # נושא תיעוד -> שם המתודה שמציגה אותו
+    _DOCS_HANDLERS = (
+        ("1", "_show_quick_start_guide"),
+        ("5", "_show_hybrid_guide"),
+        ("7", "_show_troubleshooting_guide_hybrid")
+    )
+    
+    # מופע יחיד עם סט תכונות קבוע - בלי __dict__
+    __slots__ = (
+        "version", "workers", "processes", "running", "mode",
+        "hybrid_collector", "_features_cache", "_key_status_cache", "_dispatch", "_docs_dispatch",
+        "_err_count", "_stop_event"
+    )
+    
     def __init__(self):
         self.version = "2.1.0-hybrid"
         self.workers = {}
@@ -64,6 +408,23 @@ class EnhancedTradingBotManager:
         # Hybrid collector
         self.hybrid_collector = None
         
+        # מטמוני זמינות features וסטטוס מפתחות לתפריט - מתאפסים כשההגדרות משתנות
+        self._features_cache = None
+        self._key_status_cache = None
+        
+        # טבלאות dispatch - מתודות קשורות, נבנות פעם אחת (None אם המתודה לא קיימת)
+        self._dispatch = {action: getattr(self, name, None) for action, name in self._ACTION_HANDLERS}
+        # כל נושא בתפריט התיעוד מופיע כמפתח; None לנושא בלי מדריך מובנה
+        self._docs_dispatch = dict.fromkeys(key for key, _ in _DOCS_MENU)
+        self._docs_dispatch.update((key, getattr(self, name)) for key, name in self._DOCS_HANDLERS)
+        
+        # מונה שגיאות רצופות בלולאה הראשית - להשהיה הולכת וגדלה
+        self._err_count = 0
+        
+        # אות עצירה משותף ללולאות הניטור ול-threads ברקע
+        import threading
+        self._stop_event = threading.Event()
+        
         # בדיקת סביבה מתקדמת
         self._check_environment()
         
@@ -85,17 +446,20 @@ class EnhancedTradingBotManager:
             ('asyncio', 'Async support')
         ]
         
+        # הבדיקה רק מאתרת את החבילה, בלי להריץ את קוד האתחול שלה; החיפושים
+        # בתיקיות (stat) רצים במקביל, וההדפסה נשארת לפי הסדר
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=len(critical_packages)) as executor:
+            available = list(executor.map(module_available,
+                                          (package for package, _ in critical_packages)))
+        
         missing_packages = []
-        for package, description in critical_packages:
-            try:
-                if package == 'asyncio':
-                    import asyncio
-                else:
-                    __import__(package)
-                print(f"✅ {package} - {description}")
-            except ImportError:
+        for (package, description), found in zip(critical_packages, available):
+            if not found:
                 missing_packages.append(package)
                 print(f"❌ {package} - {description} (MISSING)")
+            else:
+                print(f"✅ {package} - {description}")
         
         if missing_packages:
             print(f"\n⚠️  Missing packages: {', '.join(missing_packages)}")
@@ -118,48 +482,27 @@ class EnhancedTradingBotManager:
         except Exception as e:
             print(f"⚠️  Error checking API keys: {e}")
     
+    def _banner_text(self):
+        """טקסט הבאנר - התבנית מתמלאת בגרסה ובמצב האיסוף"""
+        hybrid_status = "🚀 HYBRID MODE" if HYBRID_AVAILABLE else "📡 HTTP MODE"
+        return _BANNER_TEMPLATE.format(version=self.version, hybrid_status=hybrid_status)
+    
     def print_banner(self):
         """הצגת באנר פתיחה עם תכונות היברידיות"""
-        hybrid_status = "🚀 HYBRID MODE" if HYBRID_AVAILABLE else "📡 HTTP MODE"
-        
-        banner = f"""
-╔═══════════════════════════════════════════════════════════════╗
-║                💎 Kraken Trading Bot v{self.version} 💎                ║
-║                                                               ║
-║        🤖 Advanced AI-Powered Crypto Trading System          ║
-║            {hybrid_status:<20} ⚡ Real-Time Data            ║
-║                                                               ║
-║  📊 Live Prices  🧠 ML Predictions  ⚡ Auto Trading         ║
-╚═══════════════════════════════════════════════════════════════╝
-        """
-        print(banner)
+        sys.stdout.write(self._banner_text() + "\n")
     
     def show_menu(self):
-        """תפריט ראשי עם אפשרויות היברידיות"""
-        self.print_banner()
+        """תפריט ראשי עם אפשרויות היברידיות
         
-        print("\n🎯 Main Menu:")
-        print("═" * 60)
+        כל המסך (באנר, אפשרויות וסטטוס) נבנה לרשימה אחת ונכתב ב-write יחיד
+        """
+        parts = [self._banner_text(), "\n🎯 Main Menu:", _MENU_RULE]
         
         # בדיקת זמינות features
         features_status = self._check_features_availability()
         
-        menu_options = [
-            ("1", "🚀 Quick Start - Simple Dashboard", "simple_dashboard", True),
-            ("2", "📊 Hybrid Data Collection (WebSocket + HTTP)", "hybrid_collect_data", HYBRID_AVAILABLE),
-            ("3", "📈 Classic Data Collection (HTTP Only)", "collect_data", True),
-            ("4", "🤖 AI Trading Dashboard", "ai_dashboard", features_status['ai_features']),
-            ("5", "🔄 Full Hybrid System", "hybrid_full_system", HYBRID_AVAILABLE),
-            ("6", "🧪 Trading Simulations", "simulations", features_status['simulations']),
-            ("7", "📈 Market Analysis Tools", "analysis", features_status['analysis']),
-            ("8", "⚙️  System Configuration", "settings", True),
-            ("9", "🪙 Symbol & Asset Manager", "symbols", features_status['data_collection']),
-            ("10", "🔧 Debug & Diagnostics", "debug", True),
-            ("11", "📚 Help & Documentation", "docs", True),
-            ("0", "🚪 Exit System", "exit", True)
-        ]
-        
-        for key, desc, _, available in menu_options:
+        for key, desc, _, requirement in self._MENU_DEFS:
+            available = self._menu_option_available(requirement, features_status)
             status = "✅" if available else "❌"
             color = "" if available else " (unavailable)"
             
@@ -167,21 +510,47 @@ class EnhancedTradingBotManager:
             if "Hybrid" in desc and available:
                 desc = f"🌟 {desc}"
             
-            print(f"  {key}. {status} {desc}{color}")
+            parts.append(f"  {key}. {status} {desc}{color}")
         
-        print("\n" + "═" * 60)
+        parts.append("\n" + _MENU_RULE)
         
         # הצגת סטטוס מערכת מעודכן
-        self._show_system_status()
+        parts.extend(self._system_status_lines())
+        sys.stdout.write("\n".join(parts) + "\n")
         
         choice = input("\n👉 Your choice: ").strip()
         
-        # מיפוי בחירות
-        choice_map = {opt[0]: opt[2] for opt in menu_options}
-        return choice_map.get(choice, "invalid")
+        return self._CHOICE_MAP.get(choice, "invalid")
+    
+    @staticmethod
+    def _menu_option_available(requirement, features_status):
+        """זמינות אפשרות בתפריט לפי הדרישה שלה ב-_MENU_DEFS"""
+        if requirement == 'always':
+            return True
+        if requirement == 'hybrid':
+            return HYBRID_AVAILABLE
+        return features_status[requirement]
+    
+    def _invalidate_features_cache(self):
+        """איפוס מטמון זמינות ה-features וסטטוס המפתחות אחרי שינוי הגדרות"""
+        self._features_cache = None
+        self._key_status_cache = None
+    
+    def _check_key_status(self):
+        """האם מפתחות Kraken ו-OpenAI מוגדרים - לשורת הסטטוס בתפריט (נשמר במטמון עד שינוי הגדרות)"""
+        if self._key_status_cache is None:
+            key_statuses = Config.get_all_api_status()
+            self._key_status_cache = {
+                key_name: bool(key_statuses.get(key_name, {}).get('configured'))
+                for key_name in ('KRAKEN_API_KEY', 'OPENAI_API_KEY')
+            }
+        return self._key_status_cache
     
     def _check_features_availability(self):
-        """בדיקת זמינות features עם תמיכה היברידית"""
+        """בדיקת זמינות features עם תמיכה היברידית (נשמר במטמון עד שינוי הגדרות)"""
+        if self._features_cache is not None:
+            return self._features_cache
+        
         status = {
             'data_collection': True,
             'hybrid_collection': HYBRID_AVAILABLE,
@@ -191,22 +560,8 @@ class EnhancedTradingBotManager:
             'full_system': True
         }
         
-        # בדיקת modules זמינים
-        try:
-            if HYBRID_AVAILABLE:
-                from hybrid_market_collector import HybridMarketCollector
-                status['hybrid_collection'] = True
-            else:
-                from market_collector import MarketCollector
-                status['data_collection'] = True
-        except ImportError:
-            status['data_collection'] = False
-            status['hybrid_collection'] = False
-        
-        try:
-            from ai_trading_engine import AITradingEngine
-            status['ai_features'] = status['ai_features'] and True
-        except ImportError:
+        # מודול האיסוף כבר אותר בטעינת main (בלי מודול איסוף התוכנית יוצאת) - רק ai נבדק כאן
+        if not module_available('modules.ai_trading_engine'):
             status['ai_features'] = False
         
         status['full_system'] = any([
@@ -216,48 +571,92 @@ class EnhancedTradingBotManager:
             status['analysis']
         ])
         
+        self._features_cache = status
         return status
     
-    def _show_system_status(self):
-        """הצגת סטטוס מערכת עם מידע היברידי"""
-        print("\n📊 System Status:")
-        print(f"  • Version: {self.version}")
-        print(f"  • Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    def _system_status_lines(self):
+        """שורות סטטוס המערכת עם מידע היברידי"""
+        lines = [
+            "\n📊 System Status:",
+            f"  • Version: {self.version}",
+            f"  • Time: {time.strftime('%Y-%m-%d %H:%M:%S')}",
+        ]
         
         # Collector status
         if HYBRID_AVAILABLE:
-            print("  • Data Collection: 🚀 Hybrid Mode (WebSocket + HTTP)")
+            lines.append("  • Data Collection: 🚀 Hybrid Mode (WebSocket + HTTP)")
         else:
-            print("  • Data Collection: 📡 HTTP Mode Only")
+            lines.append("  • Data Collection: 📡 HTTP Mode Only")
         
-        # API Keys status
-        kraken_key_status = Config.get_api_key_status('KRAKEN_API_KEY')
-        openai_key_status = Config.get_api_key_status('OPENAI_API_KEY')
+        # API Keys status - מטמון נפרד מה-features (מתאפס כשההגדרות משתנות)
+        key_status = self._check_key_status()
+        lines.append(f"  • API Keys: {'✅ Configured' if key_status['KRAKEN_API_KEY'] else '❌ Missing'}")
+        lines.append(f"  • AI Features: {'✅ Available' if key_status['OPENAI_API_KEY'] else '⚠️  Limited'}")
         
-        print(f"  • API Keys: {'✅ Configured' if kraken_key_status.get('configured') else '❌ Missing'}")
-        print(f"  • AI Features: {'✅ Available' if openai_key_status.get('configured') else '⚠️  Limited'}")
-        
-        # בדיקת קבצי נתונים
-        data_files = ['market_live.csv', 'market_history.csv', 'news_feed.csv']
+        # בדיקת קבצי נתונים - קריאת תיקייה אחת, לכל היותר פעם ב-5 שניות
+        snapshot = _snapshot_data_dir(max_age=5)
         data_status = []
-        for file in data_files:
-            path = os.path.join(Config.DATA_DIR, file)
-            if os.path.exists(path):
-                size = os.path.getsize(path) / 1024  # KB
+        for file in _STATUS_DATA_FILES:
+            file_stat = snapshot.get(file)
+            if file_stat:
+                size = file_stat.st_size / 1024  # KB
                 data_status.append(f"{file}({size:.1f}KB)")
         
         if data_status:
-            print(f"  • Data Files: {len(data_status)} available")
+            lines.append(f"  • Data Files: {len(data_status)} available")
         else:
-            print("  • Data Files: None (will be created)")
+            lines.append("  • Data Files: None (will be created)")
+        return lines
+    
+    def _show_system_status(self):
+        """הצגת סטטוס מערכת עם מידע היברידי"""
+        sys.stdout.write("\n".join(self._system_status_lines()) + "\n")
+    
+    @contextlib.contextmanager
+    def _stop_on_sigint(self, reap_children: bool = False):
+        """בתוך הבלוק Ctrl+C ו-SIGTERM רק מסמנים את self._stop_event (ההמתנה מתעוררת מיד)
+        
+        עם reap_children, SIGCHLD אוסף מיד דאשבורד שיצא במקום להשאיר zombie עד הכיבוי.
+        ה-Event מתאפס בכניסה, וה-handlers הקודמים מוחזרים ביציאה
+        """
+        import signal
+        
+        def request_stop(*_):
+            self._stop_event.set()
+        
+        handlers = {signal.SIGINT: request_stop, signal.SIGTERM: request_stop}
+        if reap_children and hasattr(signal, 'SIGCHLD'):  # לא קיים ב-Windows
+            handlers[signal.SIGCHLD] = lambda *_: self._reap_exited_processes()
+        
+        self._stop_event.clear()
+        previous_handlers = {signum: signal.signal(signum, handler) for signum, handler in handlers.items()}
+        try:
+            yield self._stop_event
+        finally:
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
+    
+    def _reap_exited_processes(self):
+        """הוצאת תהליכים שיצאו מ-self.processes - poll() אוסף את ה-zombie"""
+        for name, process in list(self.processes.items()):
+            if process and process.poll() is not None:
+                logger.warning(f"{name} exited (code {process.returncode})")
+                del self.processes[name]
     
     def run_hybrid_data_collection(self):
         """הפעלת איסוף נתונים היברידי חדש"""
+        
         if not HYBRID_AVAILABLE:
             print("❌ Hybrid collection not available. Falling back to HTTP collection.")
             self.run_data_collection()
             return
         
+        hybrid_market_collector = _load_hybrid_collector()
+        if hybrid_market_collector is None:
+            print("❌ Hybrid collector failed to load (see log). Falling back to HTTP collection.")
+            self.run_data_collection()
+            return
+        
         print("\n🚀 Starting Hybrid Data Collection System...")
         print("📡 WebSocket: Real-time price updates")
         print("🌐 HTTP: Account data, history, fallback")
@@ -266,35 +665,27 @@ class EnhancedTradingBotManager:
         websocket_max = Config.HYBRID_CONFIG['websocket_max_symbols']  # 80
         max_symbols = Config.SYMBOL_CONFIG['max_symbols']  # 600
         
-        # קבלת כל הסמלים
+        # קבלת כל הסמלים - החלוקה ל-WebSocket/HTTP נעשית ב-collector,
+        # כאן מספיקים הגדלים ותצוגה מקדימה בלי להעתיק תתי-רשימות
         all_symbols = Config.DEFAULT_COINS[:max_symbols]
-        ws_symbols = all_symbols[:websocket_max]
-        http_symbols = all_symbols[websocket_max:]
+        ws_count = min(websocket_max, len(all_symbols))
+        http_count = len(all_symbols) - ws_count
+        ws_preview = ', '.join(itertools.islice(all_symbols, min(ws_count, 10)))
         
         print(f"\n📊 Total symbols to track: {len(all_symbols)}")
-        print(f"   ⚡ WebSocket (Real-time): {len(ws_symbols)} symbols")
-        print(f"   📡 HTTP (Every 2 min): {len(http_symbols)} symbols")
-        print(f"   WebSocket symbols: {', '.join(ws_symbols[:10])}{'...' if len(ws_symbols) > 10 else ''}")
+        print(f"   ⚡ WebSocket (Real-time): {ws_count} symbols")
+        print(f"   📡 HTTP (Every 2 min): {http_count} symbols")
+        print(f"   WebSocket symbols: {ws_preview}{'...' if ws_count > 10 else ''}")
         
         # התחלת collector
         try:
             print("\n⏳ Initializing hybrid collector...")
             
-            # יצירת callback לניטור
-            def on_price_update(price_update: RealTimePriceUpdate):
-                if hasattr(on_price_update, 'counter'):
-                    on_price_update.counter += 1
-                else:
-                    on_price_update.counter = 1
-                
-                # הדפסה כל 50 עדכונים כדי לא לספאם
-                if on_price_update.counter % 50 == 0:
-                    print(f"💰 [{on_price_update.counter}] {price_update.symbol}: "
-                          f"${price_update.price:,.2f} ({price_update.change_24h_pct:+.2f}%) "
-                          f"[{price_update.source}]")
+            # callback לניטור - הדפסה כל 50 עדכונים כדי לא לספאם
+            on_price_update = functools.partial(_sampled_price_print, counter=[0], stride=50)
             
             # יצירת ה-collector עם כל הסמלים
-            self.hybrid_collector = HybridMarketCollector(
+            self.hybrid_collector = hybrid_market_collector.HybridMarketCollector(
                 symbols=all_symbols,  # שולחים את כל הסמלים
                 api_key=Config.get_api_key('KRAKEN_API_KEY'),
                 api_secret=Config.get_api_key('KRAKEN_API_SECRET')
@@ -308,27 +699,18 @@ class EnhancedTradingBotManager:
             
             print("✅ Hybrid collector started successfully!")
             print("\n📊 Collection Status:")
-            print(f"  • WebSocket: Connecting to Kraken for {len(ws_symbols)} symbols...")
-            print(f"  • HTTP: Will update {len(http_symbols)} symbols every {Config.HYBRID_CONFIG['http_update_interval']}s")
+            print(f"  • WebSocket: Connecting to Kraken for {ws_count} symbols...")
+            print(f"  • HTTP: Will update {http_count} symbols every {Config.HYBRID_CONFIG['http_update_interval']}s")
             print("  • Database: Storing all updates")
             print("  • CSV Files: Updated for compatibility")
             
             print("\n⏹️  Press Ctrl+C to stop collection")
             
-            # לולאת ניטור
-            while True:
-                time.sleep(30)  # כל 30 שניות
-                
-                stats = self.hybrid_collector.get_statistics()
-                current_time = datetime.now().strftime('%H:%M:%S')
-                
-                print(f"\n[{current_time}] 📊 Hybrid Collection Stats:")
-                print(f"  • Total Updates: {stats['total_updates']}")
-                print(f"  • WebSocket Updates: {stats['websocket_updates']}")
-                print(f"  • HTTP Updates: {stats['http_updates']}")
-                print(f"  • Updates/Min: {stats.get('updates_per_minute', 0):.1f}")
-                print(f"  • WebSocket Status: {stats['websocket_status']}")
-                print(f"  • Active Symbols: {stats['active_symbols']}/{len(all_symbols)}")
+            # לולאת ניטור - כל 30 שניות, Ctrl+C מסיים מיד
+            with self._stop_on_sigint() as stop_event:
+                while not stop_event.wait(30):
+                    self._print_hybrid_stats(len(all_symbols))
+            print("\n⏹️  Stopping hybrid collection...")
                 
         except KeyboardInterrupt:
             print("\n⏹️  Stopping hybrid collection...")
@@ -339,8 +721,20 @@ class EnhancedTradingBotManager:
             if self.hybrid_collector:
                 self.hybrid_collector.stop()
                 print("✅ Hybrid collector stopped")
+    
+    def _print_hybrid_stats(self, total_symbols: int):
+        """הדפסת סטטיסטיקות האיסוף ההיברידי ללולאת הניטור"""
+        # המילון שמוחזר מ-get_statistics משמש ישירות כמקור לתבנית
+        stats = self.hybrid_collector.get_statistics()
+        stats.setdefault('updates_per_minute', 0)
+        stats['time'] = time.strftime('%H:%M:%S')
+        stats['total_symbols'] = total_symbols
+        sys.stdout.write(_HYBRID_STATS_TEMPLATE.format_map(stats))
+    
     def run_data_collection(self):
         """הפעלת איסוף נתונים קלאסי (HTTP בלבד)"""
+        import threading
+        
         print("\n📊 Starting Classic Data Collection System (HTTP)...")
         
         # ייבוא המודול הקלאסי
@@ -372,12 +766,13 @@ class EnhancedTradingBotManager:
         market_thread.start()
         print("✅ Market data collection started (30s intervals)")
         
-        # News Collector
+        # News Collector - נעצר יחד עם לולאת ההמתנה דרך self._stop_event
+        self._stop_event.clear()
         if news_available:
             def run_news_collector():
                 try:
                     print("📰 News Collector: Starting...")
-                    run_news_monitor(interval=300)
+                    run_news_monitor(interval=300, stop_event=self._stop_event)
                 except Exception as e:
                     logger.error(f"News Collector error: {e}")
                     print(f"❌ News Collector failed: {e}")
@@ -393,13 +788,18 @@ class EnhancedTradingBotManager:
         print("  • Files saved to: data/")
         print("\n⏹️  Press Ctrl+C to stop all collection")
         
+        # Ctrl+C רק מסמן את ה-Event - הלולאה מתעוררת מיד ויוצאת
         try:
-            while True:
-                time.sleep(30)
-                current_time = datetime.now().strftime('%H:%M:%S')
-                print(f"[{current_time}] ⚡ Classic collection running... (Ctrl+C to stop)")
-        except KeyboardInterrupt:
+            with self._stop_on_sigint() as stop_event:
+                while not stop_event.wait(30):
+                    if not market_thread.is_alive():
+                        print("❌ Market Collector stopped unexpectedly")
+                        break
+                    current_time = time.strftime('%H:%M:%S')
+                    print(f"[{current_time}] ⚡ Classic collection running... (Ctrl+C to stop)")
+        finally:
             print("\n⏹️  Stopping classic data collection...")
+            self._stop_event.set()
             print("✅ Collection stopped")
     
     def run_hybrid_full_system(self):
@@ -430,36 +830,29 @@ class EnhancedTradingBotManager:
                 return
         
         processes = []
+        self._stop_event.clear()
         
         try:
-            # 1. Start hybrid data collection
+            # 1. Start hybrid data collection - ה-collector מריץ threads משלו, בלי thread עוטף
             print("\n🚀 Starting hybrid data collection...")
-            data_thread = threading.Thread(
-                target=self._run_hybrid_data_background,
-                daemon=True
-            )
-            data_thread.start()
-            processes.append(('Hybrid Data Collection', data_thread))
+            if self._run_hybrid_data_background():
+                processes.append(('Hybrid Data Collection', self.hybrid_collector))
             time.sleep(3)  # Allow time to initialize
             
             # 2. Start dashboard
             print("\n🖥️  Starting dashboard...")
-            dashboard_thread = threading.Thread(
-                target=self.run_dashboard_background,
-                daemon=True
-            )
-            dashboard_thread.start()
-            processes.append(('Dashboard', dashboard_thread))
+            dashboard_process = self.run_dashboard_background()
+            if dashboard_process:
+                self.processes['dashboard'] = dashboard_process
+                processes.append(('Dashboard', dashboard_process))
             
             # 3. Start AI dashboard if available
             if required_features['ai_features']:
                 print("\n🤖 Starting AI dashboard...")
-                ai_thread = threading.Thread(
-                    target=self.run_ai_dashboard_background,
-                    daemon=True
-                )
-                ai_thread.start()
-                processes.append(('AI Dashboard', ai_thread))
+                ai_process = self.run_ai_dashboard_background()
+                if ai_process:
+                    self.processes['ai_dashboard'] = ai_process
+                    processes.append(('AI Dashboard', ai_process))
             
             print("\n✅ Full hybrid system started!")
             print("📊 Components running:")
@@ -473,48 +866,58 @@ class EnhancedTradingBotManager:
             print("\n⏹️  Press Ctrl+C to stop all components")
             
             # Keep main thread alive with status updates
-            while True:
-                time.sleep(60)
-                current_time = datetime.now().strftime('%H:%M:%S')
-                
-                # Get hybrid stats if available
-                status_info = ""
-                if self.hybrid_collector:
-                    try:
-                        stats = self.hybrid_collector.get_statistics()
-                        status_info = f" | Updates: {stats['total_updates']} | WS: {stats['websocket_status']}"
-                    except:
-                        pass
-                
-                print(f"[{current_time}] 🔄 Full hybrid system running{status_info}...")
+            with self._stop_on_sigint(reap_children=True) as stop_event:
+                while not stop_event.wait(60):
+                    current_time = time.strftime('%H:%M:%S')
+                    
+                    # Get hybrid stats if available
+                    status_info = ""
+                    if self.hybrid_collector:
+                        try:
+                            stats = self.hybrid_collector.get_statistics()
+                            status_info = f" | Updates: {stats['total_updates']} | WS: {stats['websocket_status']}"
+                        except:
+                            pass
+                    
+                    print(f"[{current_time}] 🔄 Full hybrid system running{status_info}...")
         
         except KeyboardInterrupt:
-            print("\n⏹️  Shutting down full hybrid system...")
-            self._cleanup_processes()
-            print("✅ Full hybrid system stopped")
+            pass
+        
+        print("\n⏹️  Shutting down full hybrid system...")
+        self._cleanup_processes()
+        print("✅ Full hybrid system stopped")
     
-    def _run_hybrid_data_background(self):
-        """איסוף נתונים היברידי ברקע"""
+    def _run_hybrid_data_background(self) -> bool:
+        """הפעלת איסוף נתונים היברידי ברקע
+        
+        start() לא חוסם - ה-collector מריץ את ה-threads שלו ונעצר ב-_cleanup_processes
+        """
+        hybrid_market_collector = _load_hybrid_collector()
+        if hybrid_market_collector is None:
+            logger.error("Background hybrid data collection: hybrid collector failed to load")
+            return False
+        
         try:
             symbols = Config.DEFAULT_COINS[:600]  # מגבלה לביצועים
             
-            self.hybrid_collector = HybridMarketCollector(
+            self.hybrid_collector = hybrid_market_collector.HybridMarketCollector(
                 symbols=symbols,
                 api_key=Config.get_api_key('KRAKEN_API_KEY'),
                 api_secret=Config.get_api_key('KRAKEN_API_SECRET')
             )
             
             self.hybrid_collector.start()
-            
-            # Keep the collector running
-            while True:
-                time.sleep(60)
+            return True
                 
         except Exception as e:
             logger.error(f"Background hybrid data collection error: {e}")
+            return False
     
     def run_full_system(self):
         """הפעלת מערכת קלאסית מלאה"""
+        import threading
+        
         print("\n🚀 Starting Full Classic Trading System...")
         print("="*50)
         
@@ -533,6 +936,7 @@ class EnhancedTradingBotManager:
                 return
         
         processes = []
+        self._stop_event.clear()
         
         try:
             # 1. Start classic data collection
@@ -548,22 +952,18 @@ class EnhancedTradingBotManager:
             
             # 2. Start dashboard
             print("\n🖥️  Starting dashboard...")
-            dashboard_thread = threading.Thread(
-                target=self.run_dashboard_background,
-                daemon=True
-            )
-            dashboard_thread.start()
-            processes.append(('Dashboard', dashboard_thread))
+            dashboard_process = self.run_dashboard_background()
+            if dashboard_process:
+                self.processes['dashboard'] = dashboard_process
+                processes.append(('Dashboard', dashboard_process))
             
             # 3. Start AI dashboard if available
             if required_features['ai_features']:
                 print("\n🤖 Starting AI dashboard...")
-                ai_thread = threading.Thread(
-                    target=self.run_ai_dashboard_background,
-                    daemon=True
-                )
-                ai_thread.start()
-                processes.append(('AI Dashboard', ai_thread))
+                ai_process = self.run_ai_dashboard_background()
+                if ai_process:
+                    self.processes['ai_dashboard'] = ai_process
+                    processes.append(('AI Dashboard', ai_process))
             
             print("\n✅ Full classic system started!")
             print("📊 Components running:")
@@ -577,14 +977,16 @@ class EnhancedTradingBotManager:
             print("\n⏹️  Press Ctrl+C to stop all components")
             
             # Keep main thread alive
-            while True:
-                time.sleep(30)
-                print(f"[{datetime.now().strftime('%H:%M:%S')}] 🔄 Full classic system running...")
+            with self._stop_on_sigint(reap_children=True) as stop_event:
+                while not stop_event.wait(30):
+                    print(f"[{time.strftime('%H:%M:%S')}] 🔄 Full classic system running...")
                 
         except KeyboardInterrupt:
-            print("\n⏹️  Shutting down full classic system...")
-            self._cleanup_processes()
-            print("✅ Full classic system stopped")
+            pass
+        
+        print("\n⏹️  Shutting down full classic system...")
+        self._cleanup_processes()
+        print("✅ Full classic system stopped")
     
     def run_data_collection_background(self):
         """איסוף נתונים קלאסי ברקע"""
@@ -594,50 +996,49 @@ class EnhancedTradingBotManager:
         except Exception as e:
             logger.error(f"Background data collection error: {e}")
     
+    @property
+    def simple_dashboard_path(self) -> Optional[str]:
+        """נתיב הדאשבורד הפשוט (None אם לא נמצא)"""
+        return _resolve_dashboard('simple_dashboard.py')
+    
     def run_dashboard_background(self):
-        """דאשבורד ברקע"""
+        """הפעלת דאשבורד ברקע - מחזיר את התהליך (או None בכישלון)"""
+        import subprocess
+        
         try:
-            dashboard_path = os.path.join(DASHBOARDS_DIR, 'simple_dashboard.py')
-            if not os.path.exists(dashboard_path):
-                dashboard_path = os.path.join(BASE_DIR, 'simple_dashboard.py')
+            dashboard_path = self.simple_dashboard_path
+            if not dashboard_path:
+                logger.warning("Simple dashboard file not found")
+                return None
             
-            subprocess.run([
-                sys.executable, "-m", "streamlit", "run", dashboard_path,
-                "--server.headless", "true"
-            ])
+            # באותה קבוצת תהליכים כמו הבוט - סגירת הטרמינל (SIGHUP) עוצרת גם את הדאשבורד
+            return subprocess.Popen((*_STREAMLIT_RUN, dashboard_path, "--server.headless", "true"))
         except Exception as e:
             logger.error(f"Background dashboard error: {e}")
+            return None
     
     def run_ai_dashboard_background(self):
-        """הפעלת דאשבורד AI ברקע"""
+        """הפעלת דאשבורד AI ברקע - מחזיר את התהליך (או None בכישלון)"""
+        import subprocess
+        
         try:
-            dashboard_path = os.path.join(DASHBOARDS_DIR, 'advanced_dashboard.py')
-            if not os.path.exists(dashboard_path):
+            dashboard_path = _resolve_dashboard('advanced_dashboard.py')
+            if not dashboard_path:
                 logger.warning("AI dashboard file not found")
-                return
+                return None
         
-            subprocess.run([
-                sys.executable, "-m", "streamlit", "run", dashboard_path,
-                "--server.headless", "true",
-                "--server.port", "8502"
-            ])
+            return subprocess.Popen(
+                (*_STREAMLIT_RUN, dashboard_path, "--server.headless", "true", "--server.port", "8502")
+            )
         except Exception as e:
             logger.error(f"Background AI dashboard error: {e}")
+            return None
     
     def run_simple_dashboard(self):
         """הפעלת דאשבורד פשוט עם תמיכה היברידית"""
-        dashboard_paths = [
-            os.path.join(DASHBOARDS_DIR, 'simple_dashboard.py'),
-            os.path.join(BASE_DIR, 'simple_dashboard.py'),
-            os.path.join(BASE_DIR, 'dashboards', 'simple_dashboard.py')
-        ]
-        
-        dashboard_path = None
-        for path in dashboard_paths:
-            if os.path.exists(path):
-                dashboard_path = path
-                break
+        import asyncio
         
+        dashboard_path = self.simple_dashboard_path
         if not dashboard_path:
             print("❌ Simple dashboard not found!")
             return
@@ -653,18 +1054,12 @@ class EnhancedTradingBotManager:
         print("🌐 Opening browser at http://localhost:8501")
         print("⏹️  Press Ctrl+C to stop")
         
-        try:
-            import streamlit
-            
-            process = subprocess.Popen([
-                sys.executable, "-m", "streamlit", "run", dashboard_path,
-                "--server.headless", "false",
-                "--server.port", "8501",
-                "--server.address", "localhost"
-            ], env=env)
-            
-            self.processes['dashboard'] = process
-            
+        # בדיקת התקנה בלבד - streamlit עצמו נטען רק בתהליך הבן
+        if not module_available('streamlit'):
+            print("❌ Streamlit not installed. Run: pip install streamlit")
+            return
+        
+        def on_start():
             print("\n✅ Dashboard is running!")
             print("   • URL: http://localhost:8501")
             if HYBRID_AVAILABLE:
@@ -672,19 +1067,42 @@ class EnhancedTradingBotManager:
             else:
                 print("   • Mode: 📡 HTTP Only")
             print("   • Press Ctrl+C to stop")
-            
-            try:
-                process.wait()
-            except KeyboardInterrupt:
-                print("\n⏹️  Stopping dashboard...")
-                process.terminate()
-                process.wait(timeout=5)
-                
-        except ImportError:
-            print("❌ Streamlit not installed. Run: pip install streamlit")
+        
+        try:
+            asyncio.run(self._supervise_process(
+                (*_STREAMLIT_RUN, dashboard_path,
+                 "--server.headless", "false",
+                 "--server.port", "8501",
+                 "--server.address", "localhost"),
+                env=env, on_start=on_start
+            ))
+        except KeyboardInterrupt:
+            print("\n⏹️  Stopping dashboard...")
         except Exception as e:
             print(f"❌ Error starting dashboard: {e}")
     
+    async def _supervise_process(self, cmd, env=None, on_start=None):
+        """הרצת תהליך והמתנה לסיומו בלולאת asyncio - בלי thread חוסם
+        
+        בביטול (Ctrl+C) התהליך נעצר כאן, ולכן הוא לא נרשם ב-self.processes
+        """
+        import asyncio
+        
+        process = await asyncio.create_subprocess_exec(*cmd, env=env)
+        if on_start:
+            on_start()
+        
+        try:
+            return await process.wait()
+        except asyncio.CancelledError:
+            if process.returncode is None:
+                process.terminate()
+                try:
+                    await asyncio.wait_for(process.wait(), timeout=5)
+                except asyncio.TimeoutError:
+                    process.kill()
+            raise
+    
     def run_simulations(self):
         """הפעלת סימולציות"""
         print("\n🧪 Trading Simulation System")
@@ -720,13 +1138,11 @@ class EnhancedTradingBotManager:
                     print("\n💰 Real-Time Market Status:")
                     print("-" * 60)
                     
-                    for symbol, price_data in list(latest_prices.items())[:10]:
-                        change_symbol = "🟢" if price_data.change_24h_pct > 0 else "🔴" if price_data.change_24h_pct < 0 else "⚪"
-                        
-                        print(f"{change_symbol} {symbol:6} | ${price_data.price:>12,.2f} | "
-                              f"{price_data.change_24h_pct:>+6.2f}% | "
-                              f"Vol: {price_data.volume:>12,.0f} | "
-                              f"[{price_data.source}]")
+                    for symbol, price_data in itertools.islice(latest_prices.items(), 10):
+                        change = price_data.change_24h_pct
+                        print(_SIGN_ICON[(change > 0) - (change < 0) + 1],
+                              _HYBRID_ROW_FMT(symbol, price_data.price, change,
+                                              price_data.volume, price_data.source))
                     
                     # סטטיסטיקות
                     stats = self.hybrid_collector.get_statistics()
@@ -753,18 +1169,20 @@ class EnhancedTradingBotManager:
                         print("\n💰 Current Market Status:")
                         print("-" * 50)
                         
+                        # מעבר יחיד - הדפסה וצבירת הסיכומים יחד
+                        total_change = total_volume = 0.0
                         for symbol, data in prices.items():
                             price = data['price']
                             change = data.get('change_pct_24h', 0)
                             volume = data.get('volume', 0)
+                            total_change += change
+                            total_volume += volume
                             
-                            change_symbol = "🟢" if change > 0 else "🔴" if change < 0 else "⚪"
-                            
-                            print(f"{change_symbol} {symbol:6} | ${price:>10,.2f} | {change:>+6.2f}% | Vol: ${volume:>10,.0f}")
+                            print(_ROW_FMT(sym=_SIGN_ICON[(change > 0) - (change < 0) + 1],
+                                           s=symbol, p=price, c=change, v=volume))
                     
                         # Market summary
-                        avg_change = sum(data.get('change_pct_24h', 0) for data in prices.values()) / len(prices)
-                        total_volume = sum(data.get('volume', 0) for data in prices.values())
+                        avg_change = total_change / len(prices)
                         
                         print("\n📊 Market Summary:")
                         print(f"  • Average Change: {avg_change:+.2f}%")
@@ -807,8 +1225,10 @@ class EnhancedTradingBotManager:
             ('CryptoPanic API Key', 'CRYPTOPANIC_API_KEY', 'Optional - news analysis')
         ]
         
+        # כל הסטטוסים בקריאה אחת
+        key_statuses = Config.get_all_api_status()
         for name, key_name, description in api_keys:
-            key_status = Config.get_api_key_status(key_name)
+            key_status = key_statuses.get(key_name, {})
             status = "✅ Configured" if key_status.get('configured') else "❌ Missing"
             masked_key = key_status.get('masked_value', 'Not set')
             print(f"  • {name:<20} | {status:<12} | {masked_key:<15} | {description}")
@@ -823,7 +1243,7 @@ class EnhancedTradingBotManager:
         print("\n🖥️  System Information:")
         print(f"  • Python Version    | {sys.version.split()[0]}")
         print(f"  • Working Directory | {BASE_DIR}")
-        print(f"  • Config File       | {'✅ Found' if os.path.exists('.env') else '❌ Missing'}")
+        print(f"  • Config File       | {'✅ Found' if os.path.isfile('.env') else '❌ Missing'}")
         print(f"  • Data Directory    | {Config.DATA_DIR}")
         print(f"  • Logs Directory    | {Config.LOGS_DIR}")
         
@@ -841,15 +1261,18 @@ class EnhancedTradingBotManager:
             ('trading_log.csv', 'Live trading history')
         ]
         
+        snapshot = _snapshot_data_dir()
+        now = time.time()
         for filename, description in data_files:
-            path = os.path.join(Config.DATA_DIR, filename)
-            if os.path.exists(path):
-                size = os.path.getsize(path) / 1024  # KB
-                age_hours = (time.time() - os.path.getmtime(path)) / 3600
+            file_stat = snapshot.get(filename)
+            if file_stat:
+                size = file_stat.st_size / 1024  # KB
+                age_hours = (now - file_stat.st_mtime) / 3600
                 print(f"  • {filename:<25} | ✅ {size:>7.1f} KB | {age_hours:>5.1f}h old | {description}")
             else:
                 print(f"  • {filename:<25} | ❌ Not found  |           | {description}")
         
+        self._invalidate_features_cache()
         input("\nPress Enter to continue...")
   
     def _update_trading_symbols(self):
@@ -913,6 +1336,7 @@ class EnhancedTradingBotManager:
             Config.DEFAULT_COINS = ['BTC', 'ETH', 'SOL', 'ADA', 'DOT', 'MATIC', 'LINK', 'AVAX', 'XRP', 'ATOM']
             print("✅ Reset to default symbols")
         
+        self._invalidate_features_cache()
         input("\nPress Enter to continue...")
     def run_debug(self):
         """כלי debug עם בדיקות היברידיות"""
@@ -959,7 +1383,7 @@ class EnhancedTradingBotManager:
         print("🚀 Testing Hybrid Data Collection...")
         
         try:
-            from modules.hybrid_market_collector import HybridMarketCollector
+            HybridMarketCollector = cached_import('modules.hybrid_market_collector', 'HybridMarketCollector')
             
             print("✅ Hybrid collector module imported")
             
@@ -1013,6 +1437,7 @@ class EnhancedTradingBotManager:
         print("🌐 Testing WebSocket Connection...")
         
         try:
+            import json
             import asyncio
             import websockets
             
@@ -1056,7 +1481,7 @@ class EnhancedTradingBotManager:
     def _debug_data_collection(self):
         """בדיקת איסוף נתונים קלאסי"""
         try:
-            from modules.market_collector import MarketCollector
+            MarketCollector = cached_import('modules.market_collector', 'MarketCollector')
             
             print("📊 Testing Classic Data Collection...")
             collector = MarketCollector()
@@ -1080,7 +1505,7 @@ class EnhancedTradingBotManager:
     def _debug_kraken(self):
         """בדיקת Kraken API"""
         try:
-            from modules.debug_kraken import test_connection
+            test_connection = cached_import('modules.debug_kraken', 'test_connection')
             test_connection()
         except ImportError:
             print("❌ Debug Kraken module not found")
@@ -1093,27 +1518,33 @@ class EnhancedTradingBotManager:
         """בדיקת רכיבי דאשבורד"""
         print("🖥️  Testing Dashboard Components...")
         
-        try:
-            import streamlit
+        if module_available('streamlit'):
             print("✅ Streamlit installed")
-        except ImportError:
+        else:
             print("❌ Streamlit not installed")
         
         dashboard_files = [
-            ('Simple Dashboard', os.path.join(DASHBOARDS_DIR, 'simple_dashboard.py')),
-            ('Advanced Dashboard', os.path.join(DASHBOARDS_DIR, 'advanced_dashboard.py'))
+            ('Simple Dashboard', 'simple_dashboard.py'),
+            ('Advanced Dashboard', 'advanced_dashboard.py')
         ]
         
-        for name, path in dashboard_files:
-            if os.path.exists(path):
+        # קריאת התיקייה פעם אחת ובדיקת שמות מול הסט
+        try:
+            with os.scandir(DASHBOARDS_DIR) as it:
+                present = {e.name for e in it if e.is_file()}
+        except (FileNotFoundError, NotADirectoryError):
+            present = set()
+        
+        for name, filename in dashboard_files:
+            if filename in present:
                 print(f"✅ {name} found")
             else:
-                print(f"❌ {name} not found at {path}")
+                print(f"❌ {name} not found at {os.path.join(DASHBOARDS_DIR, filename)}")
     
     def _debug_simulations(self):
         """בדיקת מערכת סימולציות"""
         try:
-            from modules.simulation_core import SimulationEngine
+            SimulationEngine = cached_import('modules.simulation_core', 'SimulationEngine')
             
             print("🧪 Testing simulation engine...")
             engine = SimulationEngine(initial_balance=1000)
@@ -1128,21 +1559,26 @@ class EnhancedTradingBotManager:
         """בדיקת מערכת קבצים"""
         print("📁 File System Diagnostics...")
         
-        directories = ['data', 'logs', 'modules', 'dashboards']
-        for directory in directories:
-            path = os.path.join(BASE_DIR, directory)
-            if os.path.exists(path):
-                files = len(os.listdir(path))
-                print(f"✅ {directory}/ - {files} files")
-            else:
+        # קריאה אחת של תיקיית הבסיס, וספירה רק לתיקיות הנדרשות
+        try:
+            with os.scandir(BASE_DIR) as it:
+                subdirs = {e.name: e.path for e in it if e.is_dir()}
+        except OSError:
+            subdirs = {}
+        
+        for directory in _CHECKED_DIRS:
+            path = subdirs.get(directory)
+            if path is None:
                 print(f"❌ {directory}/ - missing")
+                continue
+            with os.scandir(path) as it:
+                files = sum(1 for _ in it)
+            print(f"✅ {directory}/ - {files} files")
         
-        # Test write permissions
-        test_file = os.path.join(Config.DATA_DIR, 'test_write.tmp')
+        # Test write permissions - יצירת קובץ ריק ומחיקתו, בלי שכבת text IO
         try:
-            with open(test_file, 'w') as f:
-                f.write('test')
-            os.remove(test_file)
+            os.close(os.open(_WRITE_TEST_FILE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644))
+            os.unlink(_WRITE_TEST_FILE)
             print("✅ File write permissions OK")
         except Exception as e:
             print(f"❌ File write permissions failed: {e}")
@@ -1183,178 +1619,38 @@ class EnhancedTradingBotManager:
         print("\n📚 System Documentation & Help")
         print("="*50)
         
-        docs_menu = [
-            ("1", "🚀 Quick Start Guide"),
-            ("2", "📊 Dashboard User Guide"),  
-            ("3", "🤖 AI Trading Features"),
-            ("4", "⚙️  API Configuration"),
-            ("5", "🌟 Hybrid Mode Guide (WebSocket + HTTP)"),
-            ("6", "🧪 Running Simulations"),
-            ("7", "🔧 Troubleshooting Guide"),
-            ("8", "📈 Market Analysis Tools"),
-            ("9", "🔒 Security Best Practices")
-        ]
-        
-        for key, title in docs_menu:
+        for key, title in _DOCS_MENU:
             available = "✅" if key != "5" or HYBRID_AVAILABLE else "❌"
             print(f"  {key}. {available} {title}")
         
         choice = input("\nSelect topic (1-9, or Enter to go back): ").strip()
         
-        if choice == "5":
-            self._show_hybrid_guide()
-        elif choice == "7":
-            self._show_troubleshooting_guide_hybrid()
-        else:
-            # Use existing documentation methods
-            if choice == "1":
-                self._show_quick_start_guide()
-            # Add other documentation methods as needed
-        
-        if choice in ["1", "2", "3", "4", "5", "6", "7", "8", "9"]:
+        if choice in self._docs_dispatch:
+            show_topic = self._docs_dispatch[choice]
+            if show_topic:
+                show_topic()
             input("\nPress Enter to continue...")
     
     def _show_hybrid_guide(self):
         """מדריך מצב היברידי"""
-        if not HYBRID_AVAILABLE:
-            print("\n❌ Hybrid Mode Not Available")
-            print("Missing: websockets package")
-            print("Install: pip install websockets")
-            return
-        
-        print("\n🌟 Hybrid Mode Guide (WebSocket + HTTP)")
-        print("="*50)
-        print("""
-WHAT IS HYBRID MODE?
-• Combines WebSocket real-time feeds with HTTP API calls
-• WebSocket: Live price updates (sub-second latency)
-• HTTP: Account data, trading history, fallback
-• Best of both worlds: Speed + Reliability
-
-ADVANTAGES:
-• ⚡ Real-time price updates (no 30-second delays)
-• 📉 Lower bandwidth usage
-• 🔄 Automatic fallback to HTTP if WebSocket fails
-• 💰 Instant trading signal generation
-• 📊 Better market analysis with live data
-
-HOW TO USE:
-1. Choose "Hybrid Data Collection" from main menu
-2. System automatically connects to WebSocket feeds
-3. HTTP used for account data and fallback
-4. Dashboard shows real-time updates
-
-REQUIREMENTS:
-• Python websockets package: pip install websockets
-• Stable internet connection
-• Kraken API keys (optional but recommended)
-
-TROUBLESHOOTING:
-• If WebSocket fails, system falls back to HTTP
-• Check firewall settings for WebSocket connections
-• Monitor logs for connection status
-
-PERFORMANCE:
-• Expect 10-100x faster price updates
-• Reduced server load on Kraken
-• More accurate trading signals
-        """)
+        sys.stdout.write(_HYBRID_GUIDE_PAGE if HYBRID_AVAILABLE else _HYBRID_UNAVAILABLE_PAGE)
     
     def _show_troubleshooting_guide_hybrid(self):
         """מדריך פתרון בעיות עם תמיכה היברידית"""
-        print("\n🔧 Troubleshooting Guide (Hybrid Mode)")
-        print("="*50)
-        print("""
-COMMON ISSUES:
-
-1. WebSocket Connection Failed:
-   → Check internet connection
-   → Verify firewall allows WebSocket connections
-   → Try restarting the hybrid collector
-   → Check logs for detailed error messages
-
-2. "Hybrid collector not available":
-   → Install websockets: pip install websockets
-   → Restart the application
-   → Check Python version (3.8+ recommended)
-
-3. WebSocket connects but no data:
-   → Check symbol subscriptions
-   → Verify Kraken WebSocket service status
-   → System will fallback to HTTP automatically
-
-4. High CPU usage with WebSocket:
-   → Reduce number of tracked symbols
-   → Check for memory leaks in logs
-   → Consider using HTTP-only mode temporarily
-
-5. Data inconsistencies:
-   → WebSocket and HTTP data may have slight differences
-   → This is normal due to timing
-   → Hybrid system prioritizes WebSocket data
-
-6. API rate limiting:
-   → WebSocket reduces API calls significantly
-   → HTTP fallback respects rate limits
-   → Account data still uses HTTP (unavoidable)
-
-HYBRID-SPECIFIC DEBUGGING:
-• Use Debug menu option "Test Hybrid Data Collection"
-• Check WebSocket connection with "Test WebSocket Connection"
-• Monitor logs for connection status changes
-• Watch for fallback messages in console
-
-GETTING HELP:
-• Enable debug logging for detailed information
-• Check system diagnostics (debug option)
-• WebSocket issues are often network-related
-• Consider running in HTTP-only mode as fallback
-        """)
+        sys.stdout.write(_TROUBLESHOOTING_PAGE)
     
     def _show_quick_start_guide(self):
         """מדריך התחלה מהירה עם היברידי"""
-        print("\n🚀 Quick Start Guide")
-        print("="*40)
-        
         mode_info = "🌟 Hybrid Mode" if HYBRID_AVAILABLE else "📡 HTTP Mode"
-        
-        print(f"""
-CURRENT MODE: {mode_info}
-
-1. INSTALLATION:
-   • Ensure Python 3.8+ is installed
-   • Run: pip install -r requirements.txt
-   • For Hybrid Mode: pip install websockets
-   • Copy .env.example to .env
-
-2. API CONFIGURATION:
-   • Get Kraken API key from kraken.com
-   • Add your keys to .env file:
-     KRAKEN_API_KEY=your_key_here
-     KRAKEN_API_SECRET=your_secret_here
-
-3. FIRST RUN:
-   • Test system: python main.py → option 10 (Debug)
-   • Start dashboard: python main.py → option 1
-   • Access at: http://localhost:8501
-
-4. DATA COLLECTION:
-   • Hybrid Mode: python main.py → option 2 (Real-time)
-   • Classic Mode: python main.py → option 3 (30s intervals)
-
-5. ADVANCED FEATURES:
-   • AI Trading: option 4 (requires OpenAI API key)
-   • Full System: option 5 (Hybrid) or option 6 (Classic)
-   • Simulations: option 6
-
-6. MONITORING:
-   • Check logs/ directory for detailed information
-   • Use debug options for troubleshooting
-   • Monitor system resources with hybrid mode
-        """)
+        sys.stdout.write(_QUICK_START_PAGE.format(mode_info=mode_info))
     
     def _cleanup_processes(self):
         """ניקוי תהליכים כולל היברידי"""
+        import subprocess
+        
+        # עצירת לולאות ההמתנה ו-threads ברקע שממתינים על ה-Event
+        self._stop_event.set()
+        
         # Stop hybrid collector
         if self.hybrid_collector:
             try:
@@ -1386,51 +1682,40 @@ CURRENT MODE: {mode_info}
                     print("💎 Safe trading!")
                     break
                     
-                elif choice == "simple_dashboard":
-                    self.run_simple_dashboard()
-                    
-                elif choice == "hybrid_collect_data":
-                    self.run_hybrid_data_collection()
-                    
-                elif choice == "collect_data":
-                    self.run_data_collection()
-                    
-                elif choice == "ai_dashboard":
-                    self.run_ai_dashboard()  # You'll need to implement this
-                    
-                elif choice == "hybrid_full_system":
-                    self.run_hybrid_full_system()
-                    
-                elif choice == "simulations":
-                    self.run_simulations()
-                    
-                elif choice == "analysis":
-                    self.show_analysis()
-                    
-                elif choice == "settings":
-                    self.show_settings()
-                    
-                elif choice == "symbols":
-                    self._update_trading_symbols()  # You'll need to implement this
-                    
-                elif choice == "debug":
-                    self.run_debug()
-                    
-                elif choice == "docs":
-                    self.show_docs()
+                elif choice in self._dispatch:
+                    handler = self._dispatch[choice]
+                    if handler:
+                        handler()
+                        self._err_count = 0
+                    else:
+                        print("❌ This option is not available in this version.")
+                        self._error_backoff()
                     
                 elif choice == "invalid":
                     print("❌ Invalid choice. Please select a number from the menu.")
-                    time.sleep(1)
+                    self._error_backoff()
                     
             except KeyboardInterrupt:
                 print("\n\n⚠️  Interrupted by user")
                 break
+            except EOFError:
+                # הקלט הסתיים (pipe/סקריפט) - אין עוד בחירות לקרוא
+                print("\n\n⚠️  End of input")
+                break
             except Exception as e:
                 logger.error(f"Unexpected error in main loop: {e}", exc_info=True)
                 print(f"❌ Unexpected error: {e}")
                 print("The system will continue running...")
-                time.sleep(2)
+                self._error_backoff()
+    
+    def _error_backoff(self):
+        """השהיה קצרה אחרי שגיאה, שגדלה עם שגיאות רצופות (עד 2 שניות)
+        
+        כשהקלט אינו טרמינל (pipe/אוטומציה) אין השהיה בכלל
+        """
+        self._err_count += 1
+        if sys.stdin.isatty():
+            time.sleep(min(2.0, 0.1 * self._err_count))
     
     def cleanup(self):
         """ניקוי משאבים"""
@@ -1439,8 +1724,16 @@ CURRENT MODE: {mode_info}
         except Exception as e:
             logger.error(f"Cleanup error: {e}")
 
-def main():
-    """נקודת כניסה ראשית מעודכנת"""
+def _bootstrap_paths():
+    """הוספת נתיבי הפרויקט ל-Python path - רק בהרצה כסקריפט, לא בייבוא"""
+    for path in [BASE_DIR, MODULES_DIR, DASHBOARDS_DIR]:
+        if path not in sys.path:
+            sys.path.insert(0, path)
+
+def _build_arg_parser():
+    """בניית parser לשורת הפקודה - נקרא רק כשיש ארגומנטים (argparse נטען רק כאן)"""
+    import argparse
+    
     parser = argparse.ArgumentParser(
         description='Kraken Trading Bot v2.1 - Hybrid WebSocket + HTTP Trading System',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -1479,7 +1772,18 @@ Examples:
         version='Kraken Trading Bot v2.1.0-hybrid'
     )
     
-    args = parser.parse_args()
+    return parser
+
+def main():
+    """נקודת כניסה ראשית מעודכנת"""
+    _bootstrap_paths()
+    
+    # הרצה בלי ארגומנטים (תפריט אינטראקטיבי) - בלי לבנות parser בכלל
+    if len(sys.argv) == 1:
+        from types import SimpleNamespace
+        args = SimpleNamespace(mode=None, symbols=None, no_git=False)
+    else:
+        args = _build_arg_parser().parse_args()
     
     # Initialize bot manager
     try:
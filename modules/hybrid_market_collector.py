@@ -8,7 +8,6 @@ import json
 import threading
 import logging
 from datetime import datetime, timedelta
-import krakenex
 from typing import Dict, List, Optional, Tuple, Callable
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import requests
@@ -22,6 +21,21 @@ import queue
 # הוספת נתיב למודולים
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import Config
+from modules.kraken_client import KrakenAPI
+
+# פענוח JSON מהיר אם orjson מותקן (json.loads מקבל גם bytes)
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# לולאת asyncio מהירה ל-WebSocket אם uvloop מותקן
+try:
+    import uvloop
+    _new_event_loop = uvloop.new_event_loop
+except ImportError:
+    _new_event_loop = asyncio.new_event_loop
 
 logger = Config.setup_logging('hybrid_market_collector')
 
@@ -51,8 +65,9 @@ class WebSocketClient:
         self.should_run = False
         
         # Callbacks
-        self.price_callbacks = []
-        self.connection_callbacks = []
+        # tuple - הוספה בונה tuple חדש, כך שאיטרציה מ-thread אחר לא רואה שינוי באמצע
+        self.price_callbacks = ()
+        self.connection_callbacks = ()
         
         # Data storage
         self.latest_prices = {}
@@ -164,7 +179,7 @@ class WebSocketClient:
     async def _handle_message(self, message: str):
         """טיפול בהודעות WebSocket"""
         try:
-            data = json.loads(message)
+            data = _json_loads(message)
             
             # הודעות מערכת
             if isinstance(data, dict):
@@ -290,11 +305,11 @@ class WebSocketClient:
     
     def add_price_callback(self, callback: Callable[[RealTimePriceUpdate], None]):
         """הוספת callback לעדכוני מחירים"""
-        self.price_callbacks.append(callback)
+        self.price_callbacks += (callback,)
     
     def add_connection_callback(self, callback: Callable[[str], None]):
         """הוספת callback לשינויי חיבור"""
-        self.connection_callbacks.append(callback)
+        self.connection_callbacks += (callback,)
     
     def get_latest_prices(self) -> Dict[str, RealTimePriceUpdate]:
         """קבלת מחירים אחרונים"""
@@ -348,7 +363,7 @@ class OptimizedHTTPClient:
         
         # Kraken API for private calls
         if self.api_key and self.api_secret:
-            self.kraken_api = krakenex.API(self.api_key, self.api_secret)
+            self.kraken_api = KrakenAPI(self.api_key, self.api_secret)
         else:
             self.kraken_api = None
     
@@ -439,7 +454,7 @@ class OptimizedHTTPClient:
             response = self.session.get(url, timeout=10)
             response.raise_for_status()
             
-            data = response.json()
+            data = _json_loads(response.content)
             
             if data.get('error'):
                 logger.error(f"Asset pairs error: {data['error']}")
@@ -473,7 +488,7 @@ class OptimizedHTTPClient:
             response = self.session.get(url, params=params, timeout=15)
             response.raise_for_status()
             
-            data = response.json()
+            data = _json_loads(response.content)
             
             if data.get('error'):
                 logger.error(f"OHLC error for {pair}: {data['error']}")
@@ -533,7 +548,7 @@ class HybridMarketCollector:
         self._init_database()
         
         # Callbacks
-        self.data_callbacks = []
+        self.data_callbacks = ()  # tuple, כמו ב-WebSocketClient
         
         # Statistics
         self.stats = {
@@ -629,7 +644,7 @@ class HybridMarketCollector:
             response = self.http_client.session.get(url, params={'pair': pairs}, timeout=15)
             response.raise_for_status()
             
-            data = response.json()
+            data = _json_loads(response.content)
             
             if data.get('error'):
                 logger.error(f"Ticker error: {data['error']}")
@@ -754,7 +769,7 @@ class HybridMarketCollector:
     
     def _websocket_worker(self):
         """Thread worker ל-WebSocket"""
-        loop = asyncio.new_event_loop()
+        loop = _new_event_loop()
         asyncio.set_event_loop(loop)
         
         try:
@@ -1033,7 +1048,7 @@ class HybridMarketCollector:
     
     def add_data_callback(self, callback: Callable[[RealTimePriceUpdate], None]):
         """הוספת callback לעדכוני נתונים"""
-        self.data_callbacks.append(callback)
+        self.data_callbacks += (callback,)
     
     # Methods for backward compatibility
     def get_combined_prices(self, symbols: List[str]) -> Dict[str, Dict]:
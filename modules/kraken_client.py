@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+לקוח Kraken עם פענוח JSON מהיר
+משתמש ב-orjson אם מותקן, אחרת נופל חזרה ל-parser הרגיל של requests
+"""
+
+import krakenex
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+class KrakenAPI(krakenex.API):
+    """krakenex.API שמפענח תשובות עם orjson"""
+
+    def _query(self, urlpath, data, headers=None, timeout=None):
+        """שליחת בקשה ופענוח התשובה - זהה ל-krakenex מלבד ה-parser
+
+        עם orjson התשובה מפוענחת ישירות מה-bytes; בלעדיו - response.json() הרגיל
+        """
+        if data is None:
+            data = {}
+        if headers is None:
+            headers = {}
+
+        url = self.uri + urlpath
+
+        response = self.session.post(url, data=data, headers=headers, timeout=timeout)
+        self.response = response
+
+        if response.status_code not in (200, 201, 202):
+            response.raise_for_status()
+
+        if ORJSON_AVAILABLE:
+            # פענוח ישיר מה-bytes, בלי decode ל-str
+            return orjson.loads(response.content)
+        return response.json(**getattr(self, '_json_options', {}))
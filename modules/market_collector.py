@@ -3,7 +3,6 @@ import sys
 import pandas as pd
 import time
 from datetime import datetime, timedelta
-import krakenex
 from typing import Dict, List, Optional, Tuple
 import logging
 from concurrent.futures import ThreadPoolExecutor, as_completed
@@ -17,6 +16,7 @@ from functools import lru_cache
 # הוספת נתיב למודולים
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import Config
+from modules.kraken_client import KrakenAPI
 
 logger = Config.setup_logging('market_collector')
 
@@ -116,7 +116,7 @@ class MarketCollector:
             
             if kraken_key and kraken_secret:
                 try:
-                    self.kraken_api = krakenex.API(kraken_key, kraken_secret)
+                    self.kraken_api = KrakenAPI(kraken_key, kraken_secret)
                     logger.info("Kraken API initialized successfully")
                 except Exception as e:
                     logger.error(f"Failed to initialize Kraken API: {e}")
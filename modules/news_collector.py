@@ -7,6 +7,7 @@ import os
 import sys
 import time
 import json
+import threading
 from textblob import TextBlob
 import re
 
@@ -34,6 +35,9 @@ class NewsCollector:
         self.news_file = Config.NEWS_FEED_FILE
         self.archive_file = os.path.join(Config.DATA_DIR, 'news_archive.csv')
         
+        # חיבור HTTP משותף (keep-alive) לכל מחזורי האיסוף
+        self.session = requests.Session()
+        
         # cache לניתוח סנטימנט
         self.sentiment_cache = {}
         
@@ -64,7 +68,7 @@ class NewsCollector:
         
         try:
             logger.info(f"Fetching {filter_type} {kind} for {len(self.currencies)} currencies")
-            response = requests.get(url, params=params, timeout=10)
+            response = self.session.get(url, params=params, timeout=10)
             response.raise_for_status()
             
             data = response.json()
@@ -408,8 +412,9 @@ class NewsCollector:
             return {'sentiment': 'neutral', 'confidence': 0}
 
 
-def run_news_monitor(interval: int = 300):
-    """הפעלת מוניטור חדשות רציף"""
+def run_news_monitor(interval: int = 300, stop_event: Optional[threading.Event] = None):
+    """הפעלת מוניטור חדשות רציף - נעצר מיד כש-stop_event מסומן"""
+    stop_event = stop_event or threading.Event()
     collector = NewsCollector(
         currencies=Config.DEFAULT_COINS[:15],
         max_posts=100,
@@ -418,7 +423,7 @@ def run_news_monitor(interval: int = 300):
     
     logger.info(f"News monitor started - interval: {interval}s")
     
-    while True:
+    while not stop_event.is_set():
         try:
             # איסוף חדשות
             df = collector.fetch_and_save()
@@ -435,15 +440,17 @@ def run_news_monitor(interval: int = 300):
                     logger.info(f"{currency} sentiment: {sentiment['sentiment']} "
                                f"(confidence: {sentiment['confidence']}%)")
             
-            # המתנה
-            time.sleep(interval)
+            # המתנה - מתעוררת מיד בעצירה
+            stop_event.wait(interval)
             
         except KeyboardInterrupt:
             logger.info("News monitor stopped by user")
             break
         except Exception as e:
             logger.error(f"Monitor error: {e}", exc_info=True)
-            time.sleep(interval)
+            stop_event.wait(interval)
+    
+    logger.info("News monitor stopped")
 
 
 def test_news_collector():
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+מטמון סמלים של Kraken
+ניקוי קודי נכסים, ומיפוי זוגות USD (זוג Kraken -> סמל נקי) שנשמר לדיסק ל-24 שעות
+"""
+
+import os
+import sys
+import json
+import time
+import functools
+from typing import Dict, Optional
+
+# הוספת נתיב למודולים
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import Config
+from modules.kraken_client import KrakenAPI
+
+logger = Config.setup_logging('symbol_cache')
+
+SYMBOL_MAP_FILE = Config.DATA_DIR / 'symbol_map.json'
+SYMBOL_MAP_TTL = 24 * 60 * 60  # שניות
+SYMBOL_MAP_RETRY = 60  # שניות בין ניסיונות רענון אחרי כישלון
+
+# מיפוי קודי נכסים של Kraken לסמלים רגילים
+_ASSET_MAP = {
+    'XXBT': 'BTC', 'XBT': 'BTC', 'XETH': 'ETH', 'XXRP': 'XRP',
+    'XLTC': 'LTC', 'XXMR': 'XMR', 'XZEC': 'ZEC', 'XXLM': 'XLM',
+    'XETC': 'ETC', 'XXDG': 'DOGE', 'XDG': 'DOGE', 'XMLN': 'MLN', 'XREP': 'REP',
+    'ZUSD': 'USD', 'ZEUR': 'EUR', 'ZGBP': 'GBP', 'ZCAD': 'CAD', 'ZJPY': 'JPY',
+    'USDTM': 'USDT', 'USDCM': 'USDC'
+}
+
+# עותק בזיכרון של קובץ המיפוי - (mtime, mapping)
+_loaded_map = None
+
+# זמן (monotonic) שלפניו לא מנסים שוב את AssetPairs אחרי כישלון
+_retry_after = 0.0
+
+@functools.lru_cache(maxsize=1024)
+def clean_symbol(asset: str) -> str:
+    """ניקוי סמלי מטבעות - קוד Kraken (כולל סיומות .S/.M) לסמל רגיל"""
+    code = asset.upper().split('.')[0]
+    return _ASSET_MAP.get(code, code)
+
+def _fetch_usd_pairs(api: Optional[KrakenAPI] = None) -> Dict[str, str]:
+    """בניית המיפוי מ-AssetPairs - רק זוגות שה-quote שלהם USD"""
+    api = api or KrakenAPI()
+    resp = api.query_public('AssetPairs')
+    if resp.get('error'):
+        raise RuntimeError(f"AssetPairs error: {resp['error']}")
+
+    return {
+        pair: clean_symbol(info['base'])
+        for pair, info in resp.get('result', {}).items()
+        if info.get('quote') in ('ZUSD', 'USD') and 'base' in info
+    }
+
+def _read_map_file(mtime: float) -> Optional[Dict[str, str]]:
+    """קריאת קובץ המיפוי, עם עותק בזיכרון כל עוד הקובץ לא השתנה"""
+    global _loaded_map
+    if _loaded_map and _loaded_map[0] == mtime:
+        return _loaded_map[1]
+
+    try:
+        with open(SYMBOL_MAP_FILE, 'r', encoding='utf-8') as f:
+            mapping = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not read symbol map cache: {e}")
+        return None
+
+    _loaded_map = (mtime, mapping)
+    return mapping
+
+def _write_map_file(mapping: Dict[str, str]):
+    """כתיבה אטומית של קובץ המיפוי"""
+    tmp_file = SYMBOL_MAP_FILE.with_suffix('.tmp')
+    try:
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(mapping, f)
+        os.replace(tmp_file, SYMBOL_MAP_FILE)
+    except OSError as e:
+        logger.warning(f"Could not write symbol map cache: {e}")
+
+def _stale_map(mtime: Optional[float]) -> Dict[str, str]:
+    """המיפוי האחרון מהדיסק גם אם פג תוקפו, או מילון ריק"""
+    return (_read_map_file(mtime) or {}) if mtime is not None else {}
+
+def get_usd_pairs(api: Optional[KrakenAPI] = None) -> Dict[str, str]:
+    """מיפוי זוג Kraken -> סמל נקי לכל זוגות ה-USD
+
+    נקרא מהדיסק כל עוד הקובץ צעיר מ-24 שעות (לפי mtime); אחרת נבנה מחדש
+    מ-AssetPairs. אם הבקשה נכשלת מוחזר המיפוי הישן, או מילון ריק - והבקשה
+    לא נשלחת שוב לפני שעברו SYMBOL_MAP_RETRY שניות.
+    """
+    global _retry_after
+    try:
+        mtime = SYMBOL_MAP_FILE.stat().st_mtime
+    except OSError:
+        mtime = None
+
+    if mtime is not None and time.time() - mtime < SYMBOL_MAP_TTL:
+        mapping = _read_map_file(mtime)
+        if mapping:
+            return mapping
+
+    if time.monotonic() < _retry_after:
+        return _stale_map(mtime)
+
+    try:
+        mapping = _fetch_usd_pairs(api)
+    except Exception as e:
+        logger.error(f"Failed to refresh symbol map: {e}")
+        _retry_after = time.monotonic() + SYMBOL_MAP_RETRY
+        return _stale_map(mtime)
+
+    if mapping:
+        _write_map_file(mapping)
+    return mapping